@@ -1,4 +1,6 @@
+import os
 import re
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 from pydantic import FilePath
@@ -35,6 +37,57 @@ FOLDER_NAME_CORRECTIONS = {
 }
 
 
+def _get_only_subfolder(folder: Path) -> Path | None:
+    """
+    Get the only non-hidden subfolder of a folder, skipping macOS '._' AppleDouble entries.
+
+    The listing stops at the second subfolder, so that folders with many subfolders are not listed in full.
+
+    Parameters
+    ----------
+    folder : Path
+        The folder to list
+
+    Returns
+    -------
+    Path or None
+        The subfolder of the folder, or None if it has no subfolder or more than one
+    """
+    only_subfolder = None
+    with os.scandir(folder) as entries:
+        for entry in entries:
+            if entry.name.startswith("._") or not entry.is_dir():
+                continue
+            if only_subfolder is not None:
+                return None
+            only_subfolder = Path(entry.path)
+    return only_subfolder
+
+
+def _rename_files_containing(folder: Path, old: str, new: str):
+    """
+    Replace a substring in the names of the files of a folder, printing each rename.
+
+    The files are found with a single os.scandir listing of the folder (listed in full before renaming, so that the
+    renames do not affect the listing).
+
+    Parameters
+    ----------
+    folder : Path
+        The folder containing the files
+    old : str
+        The substring to replace
+    new : str
+        The replacement substring
+    """
+    with os.scandir(folder) as entries:
+        file_names = [entry.name for entry in entries if old in entry.name and entry.is_file()]
+    for file_name in file_names:
+        new_name = file_name.replace(old, new)
+        os.rename(folder / file_name, folder / new_name)
+        print(f"  Renamed: {file_name} → {new_name}")
+
+
 def find_tdt_folders(root_folder: Path, max_depth: int = 10) -> list[Path]:
     """
     Recursively find all folders containing TDT data (identified by .tsq files).
@@ -61,41 +114,42 @@ def find_tdt_folders(root_folder: Path, max_depth: int = 10) -> list[Path]:
     tdt_folders = []
     seen_folders = set()  # Track folders we've already added
 
-    def search(folder: Path, depth: int = 0):
-        if depth > max_depth:
-            return
-
-        try:
-            # Check if this folder contains TDT data (.tsq files)
-            has_tsq_files = any(folder.glob("*.tsq"))
-
-            if has_tsq_files:
-                # Determine which folder to add
-                if is_innermost_of_neo_structure(folder):
-                    # Return the top-level folder (grandparent) instead
-                    folder_to_add = folder.parent.parent
-                else:
-                    # Regular unorganized TDT folder
-                    folder_to_add = folder
-
-                # Only add if we haven't seen this folder before
-                folder_path_str = str(folder_to_add.resolve())
-                if folder_path_str not in seen_folders:
-                    tdt_folders.append(folder_to_add)
-                    seen_folders.add(folder_path_str)
-
-                # Stop searching subdirectories - TDT data is here
-                return
-
-            # No TDT data here, search subdirectories
-            for item in folder.iterdir():
-                if item.is_dir() and not item.name.startswith("._"):
-                    search(item, depth + 1)
-
-        except (PermissionError, OSError) as e:
-            print(f"Warning: Could not access {folder}: {e}")
-
-    search(root_folder)
+    def warn(error: OSError):
+        print(f"Warning: Could not access {error.filename}: {error}")
+
+    # Walk top-down so that subdirectories can be pruned in place; os.walk lists each folder with a single scandir
+    root_folder_str = str(root_folder)
+    for folder_str, subfolder_names, file_names in os.walk(root_folder_str, onerror=warn, followlinks=True):
+        # Check if this folder contains TDT data (.tsq files, excluding macOS '._' files as make_neo_compatible does)
+        has_tsq_files = any(file_name.endswith(".tsq") and not file_name.startswith("._") for file_name in file_names)
+
+        if has_tsq_files:
+            folder = Path(folder_str)
+            # Determine which folder to add
+            if is_innermost_of_neo_structure(folder):
+                # Return the top-level folder (grandparent) instead
+                folder_to_add = folder.parent.parent
+            else:
+                # Regular unorganized TDT folder
+                folder_to_add = folder
+
+            # Only add if we haven't seen this folder before
+            folder_path_str = str(folder_to_add.resolve())
+            if folder_path_str not in seen_folders:
+                tdt_folders.append(folder_to_add)
+                seen_folders.add(folder_path_str)
+
+            # Stop searching subdirectories - TDT data is here
+            subfolder_names[:] = []
+            continue
+
+        # No TDT data here, search subdirectories (skipping macOS '._' files and beyond the maximum depth)
+        depth = folder_str[len(root_folder_str) :].count(os.sep)
+        if depth >= max_depth:
+            subfolder_names[:] = []
+        else:
+            subfolder_names[:] = [name for name in subfolder_names if not name.startswith("._")]
+
     return tdt_folders
 
 
@@ -158,16 +212,10 @@ def is_innermost_of_neo_structure(folder: Path) -> bool:
         if folder.parent is None or folder.parent.parent is None:
             return False
 
-        # Check if grandparent exists and has same name as this folder
-        grandparent = folder.parent.parent
-        if not grandparent.exists():
-            return False
-
         # Key check: grandparent name should match this folder's name
-        if grandparent.name == folder.name:
-            return True
-
-        return False
+        # (the grandparent of an existing folder exists, so no stat call is needed)
+        grandparent = folder.parent.parent
+        return grandparent.name == folder.name
 
     except (OSError, AttributeError):
         return False
@@ -192,21 +240,14 @@ def is_neo_compatible(tdt_folder: Path) -> bool:
     bool
         True if already Neo-compatible, False otherwise
     """
-    # Get non-hidden subdirectories
-    subdirs = [d for d in tdt_folder.iterdir() if d.is_dir() and not d.name.startswith("._")]
-
-    # Should have exactly one subdirectory (the session folder)
-    if len(subdirs) != 1:
+    # Should have exactly one non-hidden subdirectory (the session folder)
+    session_folder = _get_only_subfolder(tdt_folder)
+    if session_folder is None:
         return False
 
-    session_folder = subdirs[0]
-    nested_dirs = [d for d in session_folder.iterdir() if d.is_dir() and not d.name.startswith("._")]
-
     # That session folder should contain exactly one folder with same name as parent
-    if len(nested_dirs) == 1 and nested_dirs[0].name == tdt_folder.name:
-        return True
-
-    return False
+    nested_folder = _get_only_subfolder(session_folder)
+    return nested_folder is not None and nested_folder.name == tdt_folder.name
 
 
 def make_neo_compatible(tdt_folder: Path, parent_folder: Path):
@@ -251,33 +292,18 @@ def make_neo_compatible(tdt_folder: Path, parent_folder: Path):
     # Special case for M008: Rename files containing BBB8 to M008
     if "M008" in tdt_folder.name:
         print(f"Applying M008 special case - renaming BBB8 files to M008")
-        for file_path in tdt_folder.glob("*BBB8*"):
-            if file_path.is_file():
-                new_name = file_path.name.replace("BBB8", "M008")
-                new_path = file_path.parent / new_name
-                file_path.rename(new_path)
-                print(f"  Renamed: {file_path.name} → {new_name}")
+        _rename_files_containing(folder=tdt_folder, old="BBB8", new="M008")
 
     # Special case for M376_M501-251001-071000: Rename files containing M374_M501 to M376_M501
     if tdt_folder.name == "M376_M501-251001-071000":
         print(f"Applying M376_M501 special case - renaming M374_M501 files to M376_M501")
-        for file_path in tdt_folder.glob("*M374_M501*"):
-            if file_path.is_file():
-                new_name = file_path.name.replace("M374_M501", "M376_M501")
-                new_path = file_path.parent / new_name
-                file_path.rename(new_path)
-                print(f"  Renamed: {file_path.name} → {new_name}")
+        _rename_files_containing(folder=tdt_folder, old="M374_M501", new="M376_M501")
 
     # Special case: folders where files have wrong subject ID pair
     if tdt_folder.name in SUBJECT_ID_CORRECTIONS:
         wrong_pattern, correct_pattern = SUBJECT_ID_CORRECTIONS[tdt_folder.name]
         print(f"Applying subject ID correction for {tdt_folder.name}: {wrong_pattern} → {correct_pattern}")
-        for file_path in tdt_folder.glob(f"*{wrong_pattern}*"):
-            if file_path.is_file():
-                new_name = file_path.name.replace(wrong_pattern, correct_pattern)
-                new_path = file_path.parent / new_name
-                file_path.rename(new_path)
-                print(f"  Renamed: {file_path.name} → {new_name}")
+        _rename_files_containing(folder=tdt_folder, old=wrong_pattern, new=correct_pattern)
 
     # Special case for folders with incorrect dates in file names
     # Dates appear in two positions:
@@ -302,41 +328,47 @@ def make_neo_compatible(tdt_folder: Path, parent_folder: Path):
         # Pattern 2: date in subject part (after subject IDs like M363_M364-)
         subject_date_pattern = re.compile(rf"{re.escape(subject_prefix)}-(\d{{6}})-")
 
-        for file_path in tdt_folder.iterdir():
-            if file_path.is_file():
-                new_name = file_path.name
-
-                # Replace session date if wrong
-                match = session_date_pattern.search(new_name)
-                if match and match.group(1) != correct_date:
-                    old_date = match.group(1)
-                    time_part = match.group(2)
-                    new_name = new_name.replace(
-                        f"-{old_date}-{time_part}_M",
-                        f"-{correct_date}-{time_part}_M",
-                    )
-
-                # Replace subject date if wrong
-                match = subject_date_pattern.search(new_name)
-                if match and match.group(1) != correct_date:
-                    old_date = match.group(1)
-                    new_name = new_name.replace(
-                        f"{subject_prefix}-{old_date}-",
-                        f"{subject_prefix}-{correct_date}-",
-                    )
-
-                if new_name != file_path.name:
-                    new_path = file_path.parent / new_name
-                    file_path.rename(new_path)
-                    print(f"  Renamed: {file_path.name} → {new_name}")
+        # List the files first with a single os.scandir (no stat call per entry), as they are renamed in the loop
+        with os.scandir(tdt_folder) as entries:
+            file_names = [entry.name for entry in entries if entry.is_file()]
+        for file_name in file_names:
+            new_name = file_name
+
+            # Replace session date if wrong
+            match = session_date_pattern.search(new_name)
+            if match and match.group(1) != correct_date:
+                old_date = match.group(1)
+                time_part = match.group(2)
+                new_name = new_name.replace(
+                    f"-{old_date}-{time_part}_M",
+                    f"-{correct_date}-{time_part}_M",
+                )
+
+            # Replace subject date if wrong
+            match = subject_date_pattern.search(new_name)
+            if match and match.group(1) != correct_date:
+                old_date = match.group(1)
+                new_name = new_name.replace(
+                    f"{subject_prefix}-{old_date}-",
+                    f"{subject_prefix}-{correct_date}-",
+                )
+
+            if new_name != file_name:
+                os.rename(tdt_folder / file_name, tdt_folder / new_name)
+                print(f"  Renamed: {file_name} → {new_name}")
 
     # Check if already organized
     if is_neo_compatible(tdt_folder):
         print(f"Skipping {tdt_folder.name} - already Neo-compatible")
         return
 
-    # Find .tsq file to extract session name (exclude Mac hidden files)
-    tsq_files = [f for f in tdt_folder.glob("*.tsq") if not f.name.startswith("._")]
+    # Find .tsq file to extract session name (exclude Mac hidden files), with a single os.scandir listing
+    with os.scandir(tdt_folder) as entries:
+        tsq_files = [
+            Path(entry.path)
+            for entry in entries
+            if entry.name.endswith(".tsq") and not entry.name.startswith("._") and entry.is_file()
+        ]
 
     if len(tsq_files) == 0:
         print(f"Warning: No .tsq files found in {tdt_folder.name}")
@@ -359,10 +391,9 @@ def make_neo_compatible(tdt_folder: Path, parent_folder: Path):
         # Step 1: Move folder to temporary location
         temp_path = tdt_folder.rename(parent_folder / f"temp_{tdt_folder.name}")
 
-        # Step 2: Create new nested structure
-        tdt_folder.mkdir()
+        # Step 2: Create new nested structure (the folder and its session folder, in one call)
         session_folder = tdt_folder / session_name
-        session_folder.mkdir()
+        session_folder.mkdir(parents=True)
 
         # Step 3: Move data into final nested location
         temp_path.rename(session_folder / tdt_folder.name)
@@ -382,7 +413,7 @@ def make_neo_compatible(tdt_folder: Path, parent_folder: Path):
                 print(f"  → Failed to restore: {restore_error}")
 
 
-def reorganize_data(data_dir_path: FilePath):
+def reorganize_data(data_dir_path: FilePath, max_workers: int = 8):
     """
     Reorganize TDT data folders to be compatible with the Neo data reader.
 
@@ -394,6 +425,9 @@ def reorganize_data(data_dir_path: FilePath):
     ----------
     data_dir_path : FilePath
         Path to root directory containing setup folders
+    max_workers : int, default: 8
+        Maximum number of TDT folders reorganized concurrently. Use 1 to reorganize them one at a time
+        (e.g. to keep the printed messages of each folder together).
     """
     data_dir_path = Path(data_dir_path)
 
@@ -414,11 +448,12 @@ def reorganize_data(data_dir_path: FilePath):
         tdt_folders = find_tdt_folders(setup_folder)
         print(f"Found {len(tdt_folders)} TDT folders\n")
 
-        # Make each folder Neo-compatible
-        for tdt_folder in tdt_folders:
-            # Parent folder is where we'll temporarily move the folder during reorganization
-            parent_folder = tdt_folder.parent
-            make_neo_compatible(tdt_folder, parent_folder)
+        # Make each folder Neo-compatible. The folders are independent and the work is renames (syscalls that release
+        # the GIL), so they are reorganized concurrently; each uses its own temporary name in its parent folder
+        # (the parent folder is where the folder is temporarily moved during reorganization).
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(tdt_folders)))) as executor:
+            parent_folders = [tdt_folder.parent for tdt_folder in tdt_folders]
+            list(executor.map(make_neo_compatible, tdt_folders, parent_folders))  # re-raises any worker exception
 
 
 def main():
@@ -12,12 +12,61 @@ Back to:
     M296-241018-072001/  ← TDT data directly here
 """
 
+import os
 import shutil
 from pathlib import Path
 
 from pydantic import FilePath
 
 
+def _list_subfolders(folder: Path) -> list[Path]:
+    """
+    List the non-hidden subfolders of a folder, skipping macOS '._' AppleDouble entries.
+
+    Uses os.scandir, whose entries know their file type from the directory listing, so that the subfolders are
+    found without a stat call per entry.
+
+    Parameters
+    ----------
+    folder : Path
+        The folder to list
+
+    Returns
+    -------
+    list[Path]
+        The subfolders of the folder
+    """
+    with os.scandir(folder) as entries:
+        return [Path(entry.path) for entry in entries if entry.is_dir() and not entry.name.startswith("._")]
+
+
+def _get_only_subfolder(folder: Path) -> Path | None:
+    """
+    Get the only non-hidden subfolder of a folder, skipping macOS '._' AppleDouble entries.
+
+    The listing stops at the second subfolder, so that folders with many subfolders are not listed in full.
+
+    Parameters
+    ----------
+    folder : Path
+        The folder to list
+
+    Returns
+    -------
+    Path or None
+        The subfolder of the folder, or None if it has no subfolder or more than one
+    """
+    only_subfolder = None
+    with os.scandir(folder) as entries:
+        for entry in entries:
+            if entry.name.startswith("._") or not entry.is_dir():
+                continue
+            if only_subfolder is not None:
+                return None
+            only_subfolder = Path(entry.path)
+    return only_subfolder
+
+
 def find_neo_compatible_folders(root_folder: Path, max_depth: int = 10) -> list[Path]:
     """
     Recursively find all folders that are already in Neo-compatible structure.
@@ -61,9 +110,8 @@ def find_neo_compatible_folders(root_folder: Path, max_depth: int = 10) -> list[
                 return
 
             # Search subdirectories
-            for item in folder.iterdir():
-                if item.is_dir() and not item.name.startswith("._"):
-                    search(item, depth + 1)
+            for subfolder in _list_subfolders(folder):
+                search(subfolder, depth + 1)
 
         except (PermissionError, OSError) as e:
             print(f"Warning: Could not access {folder}: {e}")
@@ -91,27 +139,20 @@ def is_neo_compatible(tdt_folder: Path) -> bool:
     bool
         True if already Neo-compatible, False otherwise
     """
-    # Get non-hidden subdirectories
+    # Should have exactly one non-hidden subdirectory (the session folder)
     try:
-        subdirs = [d for d in tdt_folder.iterdir() if d.is_dir() and not d.name.startswith("._")]
+        session_folder = _get_only_subfolder(tdt_folder)
     except (PermissionError, OSError):
         return False
-
-    # Should have exactly one subdirectory (the session folder)
-    if len(subdirs) != 1:
+    if session_folder is None:
         return False
 
-    session_folder = subdirs[0]
+    # That session folder should contain exactly one folder with same name as parent
     try:
-        nested_dirs = [d for d in session_folder.iterdir() if d.is_dir() and not d.name.startswith("._")]
+        nested_folder = _get_only_subfolder(session_folder)
     except (PermissionError, OSError):
         return False
-
-    # That session folder should contain exactly one folder with same name as parent
-    if len(nested_dirs) == 1 and nested_dirs[0].name == tdt_folder.name:
-        return True
-
-    return False
+    return nested_folder is not None and nested_folder.name == tdt_folder.name
 
 
 def unorganize_folder(tdt_folder: Path) -> bool:
@@ -137,7 +178,7 @@ def unorganize_folder(tdt_folder: Path) -> bool:
     """
     try:
         # Get the session folder (only non-hidden subdirectory)
-        subdirs = [d for d in tdt_folder.iterdir() if d.is_dir() and not d.name.startswith("._")]
+        subdirs = _list_subfolders(tdt_folder)
         if len(subdirs) != 1:
             print(f"  Error: Expected 1 subdirectory, found {len(subdirs)}")
             return False
@@ -146,7 +187,7 @@ def unorganize_folder(tdt_folder: Path) -> bool:
         session_name = session_folder.name
 
         # Get the nested data folder
-        nested_dirs = [d for d in session_folder.iterdir() if d.is_dir() and not d.name.startswith("._")]
+        nested_dirs = _list_subfolders(session_folder)
         if len(nested_dirs) != 1 or nested_dirs[0].name != tdt_folder.name:
             print(f"  Error: Unexpected nested structure")
             return False
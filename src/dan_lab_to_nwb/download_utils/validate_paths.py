@@ -4,10 +4,11 @@ import json
 import re
 from pathlib import Path
 from typing import Dict, List, Optional, Set, Tuple
-from zoneinfo import ZoneInfo
 
 import pandas as pd
 
+from dan_lab_to_nwb.utils import PST
+
 
 def load_data_json(data_json_path: Path) -> List[Dict]:
     """Load and parse data.json file.
@@ -97,8 +98,7 @@ def parse_session_path(path: str) -> Optional[Dict]:
 
     # Parse date
     try:
-        pst = ZoneInfo("US/Pacific")
-        date = datetime.datetime.strptime(date_str, "%y%m%d").replace(tzinfo=pst)
+        date = datetime.datetime.strptime(date_str, "%y%m%d").replace(tzinfo=PST)
     except ValueError:
         return None
 
@@ -126,7 +126,6 @@ def load_metadata_csvs(metadata_folder_path: Path) -> Dict:
         Dictionary mapping mouse_id to metadata including dates and setups
         Format: {mouse_id: {'dates': [...], 'setups': [...], 'csv_files': [...], 'sex': str, 'dob': datetime}}
     """
-    pst = ZoneInfo("US/Pacific")
     subject_id_to_metadata = {}
 
     # Search in both metadata subfolders
@@ -160,14 +159,14 @@ def load_metadata_csvs(metadata_folder_path: Path) -> Dict:
 
                 metadata = subject_id_to_metadata[subject_id]
                 metadata["sex"] = "M" if row["M"] == 1 else "F"
-                metadata["dob"] = datetime.datetime.strptime(row["DOB"], "%m/%d/%Y").replace(tzinfo=pst)
+                metadata["dob"] = datetime.datetime.strptime(row["DOB"], "%m/%d/%Y").replace(tzinfo=PST)
 
                 # Collect all session dates and setups
                 for date_column_name, setup_column_name in zip(date_column_names, setup_column_names):
                     if pd.isna(row[date_column_name]) or pd.isna(row[setup_column_name]):
                         continue
 
-                    session_date = datetime.datetime.strptime(row[date_column_name], "%m/%d/%Y").replace(tzinfo=pst)
+                    session_date = datetime.datetime.strptime(row[date_column_name], "%m/%d/%Y").replace(tzinfo=PST)
                     session_setup = row[setup_column_name]
 
                     # Store date-setup-csv_file tuples
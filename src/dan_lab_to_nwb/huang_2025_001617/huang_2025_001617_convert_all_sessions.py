@@ -1,22 +1,26 @@
 """Primary script to run to convert all sessions in a dataset using session_to_nwb."""
-import datetime
-import shutil
+import os
 import traceback
-from concurrent.futures import ProcessPoolExecutor, as_completed
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from functools import lru_cache, partial
+from itertools import chain
 from pathlib import Path
 from pprint import pformat
-from typing import Literal, Union
+from typing import Literal, Optional, Union
 from zoneinfo import ZoneInfo
 
+import numpy as np
 import pandas as pd
 from pydantic import DirectoryPath, FilePath
-from pymatreader import read_mat
 from tqdm import tqdm
 
 from dan_lab_to_nwb.download_utils.reorganize_data import find_tdt_folders
 from dan_lab_to_nwb.huang_2025_001617.huang_2025_001617_convert_session import (
+    read_info,
     session_to_nwb,
 )
+from dan_lab_to_nwb.utils import PST, init_conversion_worker
 
 
 def dataset_to_nwb(
@@ -25,6 +29,7 @@ def dataset_to_nwb(
     output_dir_path: DirectoryPath,
     max_workers: int = 1,
     verbose: bool = True,
+    overwrite: bool = False,
 ):
     """Convert the entire dataset to NWB.
 
@@ -38,46 +43,66 @@ def dataset_to_nwb(
         The number of workers to use for parallel processing, by default 1
     verbose : bool, optional
         Whether to print verbose output, by default True
+    overwrite : bool, optional
+        Whether to convert again the sessions whose NWB file already exists in output_dir_path, by default False.
+        A failed conversion leaves no NWB file, so the sessions that failed in a previous run are converted again.
     """
     data_dir_path = Path(data_dir_path)
+    output_dir_path = Path(output_dir_path)
+    output_dir_path.mkdir(parents=True, exist_ok=True)  # once, rather than in every session_to_nwb call
     session_to_nwb_kwargs_per_session = collect_session_to_nwb_kwargs_per_session(data_dir_path=data_dir_path)
+    max_workers = max(1, min(max_workers, len(session_to_nwb_kwargs_per_session)))  # do not spawn idle workers
 
-    futures = []
-    with ProcessPoolExecutor(max_workers=max_workers) as executor:
-        for session_to_nwb_kwargs in session_to_nwb_kwargs_per_session:
-            session_to_nwb_kwargs["output_dir_path"] = output_dir_path
-            session_to_nwb_kwargs["verbose"] = verbose
-            nwbfile_name = get_nwbfile_name(session_to_nwb_kwargs=session_to_nwb_kwargs)
-            nwbfile_stem = Path(nwbfile_name).stem
-            exception_file_path = output_dir_path / f"ERROR_{nwbfile_stem}.txt"
-            futures.append(
-                executor.submit(
-                    safe_session_to_nwb,
-                    session_to_nwb_kwargs=session_to_nwb_kwargs,
-                    exception_file_path=exception_file_path,
-                )
-            )
-        for _ in tqdm(as_completed(futures), total=len(futures)):
-            pass
-
-
-def safe_session_to_nwb(*, session_to_nwb_kwargs: dict, exception_file_path: Union[Path, str]):
+    pending_session_to_nwb_kwargs = deque(session_to_nwb_kwargs_per_session)
+    max_in_flight = 2 * max_workers  # bounded, so that pending sessions do not pile up in the executor queue
+    in_flight = set()
+    progress_bar = tqdm(total=len(pending_session_to_nwb_kwargs), mininterval=1.0, smoothing=0)
+    with ProcessPoolExecutor(
+        max_workers=max_workers,
+        initializer=init_conversion_worker,
+        initargs=("dan_lab_to_nwb.huang_2025_001617.huang_2025_001617_convert_session",),
+    ) as executor:
+        while pending_session_to_nwb_kwargs or in_flight:
+            while pending_session_to_nwb_kwargs and len(in_flight) < max_in_flight:
+                session_to_nwb_kwargs = pending_session_to_nwb_kwargs.popleft()
+                session_to_nwb_kwargs["output_dir_path"] = output_dir_path
+                session_to_nwb_kwargs["verbose"] = verbose
+                session_to_nwb_kwargs["overwrite"] = overwrite
+                # The Info.mat of the session is only read in the worker, which skips the session if it is converted
+                in_flight.add(executor.submit(safe_session_to_nwb, session_to_nwb_kwargs=session_to_nwb_kwargs))
+            done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                future.result()  # re-raise the errors that safe_session_to_nwb does not record (ex. a dead worker)
+            progress_bar.update(len(done))
+    progress_bar.close()
+
+
+def safe_session_to_nwb(*, session_to_nwb_kwargs: dict, exception_file_path: Union[Path, str, None] = None):
     """Convert a session to NWB while handling any errors by recording error messages to the exception_file_path.
 
+    The error file of a previous run is removed once the session converts successfully.
+
     Parameters
     ----------
     session_to_nwb_kwargs : dict
         The arguments for session_to_nwb.
-    exception_file_path : Path
-        The path to the file where the exception messages will be saved.
+    exception_file_path : Path, optional
+        The path to the file where the exception messages will be saved. By default, the file named by
+        get_exception_file_name in the output_dir_path of the session.
     """
+    if exception_file_path is None:
+        exception_file_name = get_exception_file_name(session_to_nwb_kwargs=session_to_nwb_kwargs)
+        exception_file_path = Path(session_to_nwb_kwargs["output_dir_path"]) / exception_file_name
     exception_file_path = Path(exception_file_path)
     try:
         session_to_nwb(**session_to_nwb_kwargs)
     except Exception as e:
-        with open(exception_file_path, mode="w") as f:
-            f.write(f"session_to_nwb_kwargs: \n {pformat(session_to_nwb_kwargs)}\n\n")
-            f.write(traceback.format_exc())
+        # Write the whole message at once, so that each error file costs a single write
+        exception_file_path.write_text(
+            f"session_to_nwb_kwargs: \n {pformat(session_to_nwb_kwargs)}\n\n{traceback.format_exc()}"
+        )
+    else:
+        exception_file_path.unlink(missing_ok=True)  # the error file of a previous run no longer applies
 
 
 def get_nwbfile_name(*, session_to_nwb_kwargs: dict) -> str:
@@ -95,7 +120,7 @@ def get_nwbfile_name(*, session_to_nwb_kwargs: dict) -> str:
     """
     info_file_path = session_to_nwb_kwargs["info_file_path"]
     metadata_subfolder_name = session_to_nwb_kwargs["metadata_subfolder_name"]
-    info = read_mat(filename=info_file_path)["Info"]
+    info = read_info(info_file_path=str(info_file_path))
     session_id = info["blockname"]
     session_type = "opto-signal" if metadata_subfolder_name == "opto-signal sum" else "opto-behavioral"
     session_id = f"{session_id}-{session_type}"
@@ -104,6 +129,34 @@ def get_nwbfile_name(*, session_to_nwb_kwargs: dict) -> str:
     return nwbfile_name
 
 
+def get_exception_file_name(*, session_to_nwb_kwargs: dict) -> str:
+    """Get the name of the file where the errors of a session are recorded, ERROR_{NWB file stem}.txt.
+
+    The NWB file name is read from Info.mat, which session_to_nwb reads (and caches) in the same worker.
+    If Info.mat cannot be read, the TDT folder name is used instead of the block name.
+
+    Parameters
+    ----------
+    session_to_nwb_kwargs : dict
+        The kwargs for session_to_nwb.
+
+    Returns
+    -------
+    str
+        The exception file name, ex. 'ERROR_sub-M301_ses-M301_M302-241018-072001-opto-signal.txt'.
+    """
+    try:
+        nwbfile_name = get_nwbfile_name(session_to_nwb_kwargs=session_to_nwb_kwargs)
+    except Exception:  # session_to_nwb fails on the same Info.mat, and its error is recorded under the folder name
+        metadata_subfolder_name = session_to_nwb_kwargs["metadata_subfolder_name"]
+        session_type = "opto-signal" if metadata_subfolder_name == "opto-signal sum" else "opto-behavioral"
+        subject_id = session_to_nwb_kwargs["subject_id"]
+        tdt_folder_name = Path(session_to_nwb_kwargs["info_file_path"]).parent.name
+        return f"ERROR_sub-{subject_id}_{tdt_folder_name}-{session_type}.txt"
+    nwbfile_stem = Path(nwbfile_name).stem
+    return f"ERROR_{nwbfile_stem}.txt"
+
+
 def collect_excel_metadata(*, metadata_folder_path: DirectoryPath) -> dict[str, dict[str, dict]]:
     """Read metadata from Excel files in the specified folder.
 
@@ -116,14 +169,47 @@ def collect_excel_metadata(*, metadata_folder_path: DirectoryPath) -> dict[str,
     -------
     dict[str, dict[str, dict]]
         A dictionary mapping sheet names to dictionaries that map subject IDs to their metadata.
+        It is shared between calls for the same unchanged folder and must not be modified.
     """
-    sheet_name_to_subject_id_to_metadata: dict[str, dict[str, dict]] = {}
     metadata_folder_path = Path(metadata_folder_path)
-    for excel_file in metadata_folder_path.glob("*.csv"):
-        if excel_file.name.startswith("._"):
-            continue
-        subject_id_to_metadata = read_metadata(excel_file)
-        sheet_name_to_subject_id_to_metadata[excel_file.stem] = subject_id_to_metadata
+    excel_file_names_and_mtimes = tuple(
+        (excel_file.name, excel_file.stat().st_mtime)
+        for excel_file in metadata_folder_path.glob("*.csv")
+        if not excel_file.name.startswith("._")
+    )
+    return _collect_excel_metadata(
+        metadata_folder_path=str(metadata_folder_path), excel_file_names_and_mtimes=excel_file_names_and_mtimes
+    )
+
+
+@lru_cache(maxsize=8)
+def _collect_excel_metadata(
+    metadata_folder_path: str, excel_file_names_and_mtimes: tuple[tuple[str, float], ...]
+) -> dict[str, dict[str, dict]]:
+    """Read (and cache) the metadata csv files of a folder, keyed on their names and modification times.
+
+    The same metadata folder is collected once per setup, so it is only parsed once per process.
+
+    Parameters
+    ----------
+    metadata_folder_path : str
+        The path to the folder containing the metadata csv files.
+    excel_file_names_and_mtimes : tuple[tuple[str, float], ...]
+        The (name, modification time) of each csv file, so that edits invalidate the cache.
+
+    Returns
+    -------
+    dict[str, dict[str, dict]]
+        A dictionary mapping sheet names to dictionaries that map subject IDs to their metadata.
+    """
+    excel_files = [Path(metadata_folder_path) / excel_file_name for excel_file_name, _ in excel_file_names_and_mtimes]
+    # The csv files are independent and pd.read_csv releases the GIL while parsing, so they are read concurrently
+    with ThreadPoolExecutor(max_workers=max(1, min(8, len(excel_files)))) as executor:
+        subject_id_to_metadata_per_file = executor.map(read_metadata, excel_files)
+        sheet_name_to_subject_id_to_metadata: dict[str, dict[str, dict]] = {
+            excel_file.stem: subject_id_to_metadata
+            for excel_file, subject_id_to_metadata in zip(excel_files, subject_id_to_metadata_per_file)
+        }
     return sheet_name_to_subject_id_to_metadata
 
 
@@ -132,8 +218,6 @@ def read_metadata(excel_file: FilePath) -> dict[str, dict]:
 
     Parameters
     ----------
-    pst : ZoneInfo
-        The Pacific time zone info.
     excel_file : Path
         The path to the metadata csv file.
 
@@ -143,61 +227,140 @@ def read_metadata(excel_file: FilePath) -> dict[str, dict]:
         A dictionary mapping subject IDs to their metadata.
     """
     subject_id_to_metadata = {}
-    pst = ZoneInfo("US/Pacific")
-    df = pd.read_csv(excel_file)
-    date_column_names = [name for name in df.columns if name.startswith("date")]
-    setup_column_names = [name for name in df.columns if name.startswith("setup")]
-    record_fiber_column_names = [name for name in df.columns if name.startswith("Record fiber")]
+    column_names = pd.read_csv(excel_file, nrows=0).columns
+    # Classify the columns by prefix in a single pass over the header
+    prefix_to_column_names = {"date": [], "setup": [], "Record fiber": [], "virus volume": []}
+    for column_name in column_names:
+        for prefix, prefixed_column_names in prefix_to_column_names.items():
+            if column_name.startswith(prefix):
+                prefixed_column_names.append(column_name)
+                break
+    date_column_names = prefix_to_column_names["date"]
+    setup_column_names = prefix_to_column_names["setup"]
+    record_fiber_column_names = prefix_to_column_names["Record fiber"]
+    virus_volume_column_names = prefix_to_column_names["virus volume"]
     has_record_fiber = bool(len(record_fiber_column_names))
-    for _, row in df.iterrows():
-        subject_id = row["mouse ID"]
+    has_record_region = "Record region" in column_names
+    region_column_names = ["Stim region", "Record region"] if has_record_region else ["Stim region"]
+    # Only parse the columns that are used, with known dtypes
+    df = pd.read_csv(
+        excel_file,
+        usecols=[
+            "mouse ID",
+            "M",
+            "DOB",
+            *region_column_names,
+            *date_column_names,
+            *setup_column_names,
+            *record_fiber_column_names,
+            *virus_volume_column_names,
+        ],
+        dtype={
+            name: str
+            for name in [
+                "mouse ID",
+                "DOB",
+                *region_column_names,
+                *date_column_names,
+                *setup_column_names,
+                *virus_volume_column_names,
+            ]
+        },
+    )
+    # Parse whole date columns at once, with a fixed format so that a malformed date raises with its value
+    for date_column_name in ["DOB", *date_column_names]:
+        df[date_column_name] = pd.to_datetime(df[date_column_name], format="%m/%d/%Y", errors="raise")
+
+    # Parse whole columns at once, so that only the per-subject aggregation below loops over rows
+    subject_ids = df["mouse ID"].tolist()
+    sexes = np.where(df["M"] == 1, "M", "F").tolist()
+    dobs = _localize_dates(column=df["DOB"], tzinfo=PST)
+    optogenetic_site_names = df["Stim region"].tolist()
+    virus_volumes_in_uL = [_parse_volume_in_uL(column=df[name]) for name in virus_volume_column_names]
+    if has_record_region:
+        fiber_photometry_site_names = df["Record region"].tolist()
+    session_dates_per_column, session_setups_per_column, record_fibers_per_column = [], [], []
+    for index, date_column_name in enumerate(date_column_names):
+        setup_column_name = setup_column_names[index]
+        has_date = df[date_column_name].notna()
+        missing_setup = has_date & df[setup_column_name].isna()
+        assert not missing_setup.any(), (
+            f"Setup missing for subject {df['mouse ID'][missing_setup].iloc[0]} "
+            f"on date {df[date_column_name][missing_setup].iloc[0]}"
+        )
+        session_dates_per_column.append(_localize_dates(column=df[date_column_name], tzinfo=PST))
+        session_setups_per_column.append(df[setup_column_name].tolist())
+        if has_record_fiber:
+            record_fiber_column_name = record_fiber_column_names[index]
+            missing_record_fiber = has_date & df[record_fiber_column_name].isna()
+            assert not missing_record_fiber.any(), (
+                f"Record fiber missing for subject {df['mouse ID'][missing_record_fiber].iloc[0]} "
+                f"on date {df[date_column_name][missing_record_fiber].iloc[0]}"
+            )
+            record_fibers_per_column.append(df[record_fiber_column_name].tolist())
+
+    for row_index, subject_id in enumerate(subject_ids):
         if subject_id not in subject_id_to_metadata:
             subject_id_to_metadata[subject_id] = {}
         metadata = subject_id_to_metadata[subject_id]
-        metadata["sex"] = "M" if row["M"] == 1 else "F"
-        metadata["dob"] = datetime.datetime.strptime(row["DOB"], "%m/%d/%Y").replace(tzinfo=pst)
-        metadata["optogenetic_site_name"] = row["Stim region"]
-        virus_volume_column_names = [name for name in df.columns if name.startswith("virus volume")]
-        optogenetic_virus_volume_column_name = virus_volume_column_names[0]
-        optogenetic_virus_volume_in_nL = float(
-            row[optogenetic_virus_volume_column_name].replace("nL", "")
-        )  # 300nL --> 300.0
-        metadata["optogenetic_virus_volume_in_uL"] = optogenetic_virus_volume_in_nL / 1000.0
-        if "Record region" in df.columns:
-            metadata["fiber_photometry_site_name"] = row["Record region"]
-            fiber_photometry_virus_volume_column_name = virus_volume_column_names[1]
-            fiber_photometry_virus_volume_in_nL = float(
-                row[fiber_photometry_virus_volume_column_name].replace("nL", "")
-            )  # 300nL --> 300.0
-            metadata["fiber_photometry_virus_volume_in_uL"] = fiber_photometry_virus_volume_in_nL / 1000.0
+        metadata["sex"] = sexes[row_index]
+        metadata["dob"] = dobs[row_index]
+        metadata["optogenetic_site_name"] = optogenetic_site_names[row_index]
+        metadata["optogenetic_virus_volume_in_uL"] = virus_volumes_in_uL[0][row_index]
+        if has_record_region:
+            metadata["fiber_photometry_site_name"] = fiber_photometry_site_names[row_index]
+            metadata["fiber_photometry_virus_volume_in_uL"] = virus_volumes_in_uL[1][row_index]
         if "session_dates" not in metadata:
             metadata["session_dates"] = []
         if "session_setups" not in metadata:
             metadata["session_setups"] = []
         if "record_fibers" not in metadata and has_record_fiber:
             metadata["record_fibers"] = []
-        for index, date_column_name in enumerate(date_column_names):
-            setup_column_name = setup_column_names[index]
-            if pd.isna(row[date_column_name]):
+        for index, session_dates in enumerate(session_dates_per_column):
+            session_date = session_dates[row_index]
+            if pd.isna(session_date):
                 continue
-            assert not pd.isna(
-                row[setup_column_name]
-            ), f"Setup missing for subject {subject_id} on date {row[date_column_name]}"
-            session_date = datetime.datetime.strptime(row[date_column_name], "%m/%d/%Y").replace(tzinfo=pst)
-            session_setup = row[setup_column_name]
-            metadata["session_setups"].append(session_setup)
+            metadata["session_setups"].append(session_setups_per_column[index][row_index])
             metadata["session_dates"].append(session_date)
-
             if has_record_fiber:
-                record_fiber_column_name = record_fiber_column_names[index]
-                assert not pd.isna(
-                    row[record_fiber_column_name]
-                ), f"Record fiber missing for subject {subject_id} on date {row[date_column_name]}"
-                record_fiber = int(row[record_fiber_column_name])
-                metadata["record_fibers"].append(record_fiber)
+                metadata["record_fibers"].append(int(record_fibers_per_column[index][row_index]))
     return subject_id_to_metadata
 
 
+def _localize_dates(column: pd.Series, tzinfo: ZoneInfo) -> list:
+    """Localize a column of parsed dates into timezone-aware datetimes (NaT for missing dates).
+
+    Parameters
+    ----------
+    column : pd.Series
+        The column of dates, parsed by pd.to_datetime.
+    tzinfo : ZoneInfo
+        The time zone of the dates.
+
+    Returns
+    -------
+    list
+        The localized dates.
+    """
+    return column.dt.tz_localize(tzinfo).astype(object).tolist()
+
+
+def _parse_volume_in_uL(column: pd.Series) -> list[float]:
+    """Parse a column of virus volumes in nL (ex. "300nL") into volumes in uL.
+
+    Parameters
+    ----------
+    column : pd.Series
+        The column of virus volume strings.
+
+    Returns
+    -------
+    list[float]
+        The volumes in uL.
+    """
+    return (column.astype(str).str.replace("nL", "", regex=False).astype(float) / 1000.0).tolist()
+
+
 def collect_session_to_nwb_kwargs_per_session(*, data_dir_path: DirectoryPath):
     """Collect the kwargs for session_to_nwb for each session in the dataset.
 
@@ -236,6 +399,7 @@ def get_session_to_nwb_kwargs_per_session(
     data_dir_path: DirectoryPath,
     setup: Literal["Bing", "WS8", "MollyFP"],
     metadata_subfolder_name: Literal["opto-signal sum", "opto-behavioral sum"],
+    max_threads: Optional[int] = None,
 ):
     """Get the kwargs for session_to_nwb for each session in the dataset for a given setup and metadata subfolder.
 
@@ -247,6 +411,9 @@ def get_session_to_nwb_kwargs_per_session(
         The setup for which to get the session kwargs.
     metadata_subfolder_name : Literal["opto-signal sum", "opto-behavioral sum"]
         The metadata subfolder name.
+    max_threads : int, optional
+        The number of threads that resolve the session files concurrently. By default, the ThreadPoolExecutor
+        default, min(32, os.cpu_count() + 4).
 
     Returns
     -------
@@ -258,84 +425,196 @@ def get_session_to_nwb_kwargs_per_session(
     metadata_subfolder_path = metadata_folder_path / metadata_subfolder_name
     sheet_name_to_subject_id_to_metadata = collect_excel_metadata(metadata_folder_path=metadata_subfolder_path)
 
-    session_to_nwb_kwargs_per_session = []
     setup_folder_name = f"Setup - {setup}"
     setup_folder = data_dir_path / setup_folder_name
     tdt_folders = find_tdt_folders(root_folder=setup_folder)
+    subject_id_and_date_to_tdt_folders = _index_tdt_folders(tdt_folders=tdt_folders)
 
-    # List of (sheet_name, subject_id, session_date) tuples to skip
-    sessions_to_skip = []
+    # Set of (sheet_name, subject_id, session_date) tuples to skip
+    sessions_to_skip = set()
 
+    session_keys = []
     for sheet_name, subject_id_to_metadata in sheet_name_to_subject_id_to_metadata.items():
         for subject_id, metadata in subject_id_to_metadata.items():
             for index, session_date in enumerate(metadata["session_dates"]):
                 if (sheet_name, subject_id, session_date) in sessions_to_skip:
                     continue
                 session_setup = metadata["session_setups"][index]
-                if "record_fibers" in metadata:
-                    record_fiber = metadata["record_fibers"][index]
-                else:
-                    record_fiber = None
                 if session_setup != setup:
                     continue
+                session_keys.append((sheet_name, subject_id, metadata, index))
 
-                outer_session_folder_name = f"{subject_id}-{session_date.strftime('%y%m%d')}"
-                matched = False
-                for tdt_folder in tdt_folders:
-                    if subject_id in tdt_folder.name and session_date.strftime("%y%m%d") in tdt_folder.name:
-                        matched = True
-                        session_folder = next(p for p in tdt_folder.iterdir() if not p.name.startswith("._"))
-                        inner_session_folder = next(p for p in session_folder.iterdir() if not p.name.startswith("._"))
-
-                        info_file_path = inner_session_folder / "Info.mat"
-                        tdt_fp_folder_path = inner_session_folder
-                        tdt_ephys_folder_path = session_folder
-                        sex = metadata["sex"]
-                        dob = metadata["dob"]
-                        optogenetic_site_name = metadata["optogenetic_site_name"]
-                        optogenetic_virus_volume_in_uL = metadata["optogenetic_virus_volume_in_uL"]
-                        fiber_photometry_site_name = metadata.get("fiber_photometry_site_name", None)
-                        fiber_photometry_virus_volume_in_uL = metadata.get("fiber_photometry_virus_volume_in_uL", None)
-
-                        # Handle double-subject sessions
-                        is_double_subject = len(tdt_folder.name.split("-")[0].split("_")) > 1
-                        if is_double_subject:
-                            if subject_id == tdt_folder.name.split("-")[0].split("_")[0]:
-                                subject_number = 1
-                            else:
-                                subject_number = 2
-                        else:
-                            subject_number = 1
-                        cam_number = subject_number
-                        stream_number = subject_number
-                        video_file_path = next(
-                            p for p in inner_session_folder.glob(f"*Cam{cam_number}.avi") if not p.name.startswith("._")
-                        )
-                        stream_name = f"LFP{stream_number}"
-                        if record_fiber is None:
-                            record_fiber = subject_number
-
-                        session_to_nwb_kwargs = dict(
-                            info_file_path=info_file_path,
-                            video_file_path=video_file_path,
-                            tdt_fp_folder_path=tdt_fp_folder_path,
-                            tdt_ephys_folder_path=tdt_ephys_folder_path,
-                            subject_id=subject_id,
-                            sex=sex,
-                            dob=dob,
-                            optogenetic_site_name=optogenetic_site_name,
-                            fiber_photometry_site_name=fiber_photometry_site_name,
-                            stream_name=stream_name,
-                            record_fiber=record_fiber,
-                            optogenetic_virus_volume_in_uL=optogenetic_virus_volume_in_uL,
-                            fiber_photometry_virus_volume_in_uL=fiber_photometry_virus_volume_in_uL,
-                            metadata_subfolder_name=metadata_subfolder_name,
-                        )
-                        session_to_nwb_kwargs_per_session.append(session_to_nwb_kwargs)
-                if not matched:
-                    raise ValueError(
-                        f"No matching TDT folder found for {outer_session_folder_name} in sheet {sheet_name}"
-                    )
+    # Resolving the session files is I/O-bound, so it is done concurrently; map keeps the sessions in order
+    resolve_session_key = partial(
+        _resolve_session_key,
+        subject_id_and_date_to_tdt_folders=subject_id_and_date_to_tdt_folders,
+        metadata_subfolder_name=metadata_subfolder_name,
+    )
+    with ThreadPoolExecutor(max_workers=max_threads) as executor:
+        session_to_nwb_kwargs_per_key = executor.map(resolve_session_key, session_keys)
+        session_to_nwb_kwargs_per_session = list(chain.from_iterable(session_to_nwb_kwargs_per_key))
+
+    return session_to_nwb_kwargs_per_session
+
+
+def _index_tdt_folders(tdt_folders: list[Path]) -> dict[tuple[str, str], list[Path]]:
+    """Index TDT folders (ex. 'M301_M302-241018-072001') by each of their (subject ID, date) pairs.
+
+    Parameters
+    ----------
+    tdt_folders : list[Path]
+        The TDT folders.
+
+    Returns
+    -------
+    dict[tuple[str, str], list[Path]]
+        Mapping from (subject ID, '%y%m%d' date) to the TDT folders of that subject on that date.
+    """
+    subject_id_and_date_to_tdt_folders = {}
+    for tdt_folder in tdt_folders:
+        subject_ids, *dates = tdt_folder.name.split("-")
+        for subject_id in subject_ids.split("_"):
+            for date in dict.fromkeys(dates):  # a folder is only listed once per key
+                subject_id_and_date_to_tdt_folders.setdefault((subject_id, date), []).append(tdt_folder)
+    return subject_id_and_date_to_tdt_folders
+
+
+def _get_first_entry(folder_path: Path, suffix: str = "") -> Path:
+    """Get the first entry of a folder whose name ends with suffix, skipping macOS '._' AppleDouble files.
+
+    Uses os.scandir, which stops at the first match and does not stat the remaining entries.
+
+    Parameters
+    ----------
+    folder_path : Path
+        The folder to scan.
+    suffix : str, default: ""
+        The required end of the entry name (ex. 'Cam1.avi'). By default, any entry matches.
+
+    Returns
+    -------
+    Path
+        The path to the first matching entry.
+    """
+    with os.scandir(folder_path) as entries:
+        for entry in entries:
+            if entry.name.endswith(suffix) and not entry.name.startswith("._"):
+                return Path(entry.path)
+    raise ValueError(f"No entry ending with '{suffix}' found in {folder_path}.")
+
+
+def _resolve_session_key(
+    session_key: tuple[str, str, dict, int],
+    *,
+    subject_id_and_date_to_tdt_folders: dict[tuple[str, str], list[Path]],
+    metadata_subfolder_name: Literal["opto-signal sum", "opto-behavioral sum"],
+) -> list[dict]:
+    """Call _resolve_session_to_nwb_kwargs with a (sheet_name, subject_id, metadata, index) key, for use with map."""
+    sheet_name, subject_id, metadata, index = session_key
+    return _resolve_session_to_nwb_kwargs(
+        sheet_name=sheet_name,
+        subject_id=subject_id,
+        metadata=metadata,
+        index=index,
+        subject_id_and_date_to_tdt_folders=subject_id_and_date_to_tdt_folders,
+        metadata_subfolder_name=metadata_subfolder_name,
+    )
+
+
+def _resolve_session_to_nwb_kwargs(
+    *,
+    sheet_name: str,
+    subject_id: str,
+    metadata: dict,
+    index: int,
+    subject_id_and_date_to_tdt_folders: dict[tuple[str, str], list[Path]],
+    metadata_subfolder_name: Literal["opto-signal sum", "opto-behavioral sum"],
+) -> list[dict]:
+    """Resolve the session_to_nwb kwargs of one session of a subject from its TDT folder(s).
+
+    Parameters
+    ----------
+    sheet_name : str
+        The name of the metadata sheet the subject comes from.
+    subject_id : str
+        The subject ID.
+    metadata : dict
+        The subject metadata, as returned by read_metadata.
+    index : int
+        The index of the session in the subject's session dates.
+    subject_id_and_date_to_tdt_folders : dict[tuple[str, str], list[Path]]
+        The TDT folders of the setup, indexed by _index_tdt_folders.
+    metadata_subfolder_name : Literal["opto-signal sum", "opto-behavioral sum"]
+        The metadata subfolder name.
+
+    Returns
+    -------
+    list[dict[str, Any]]
+        The kwargs for session_to_nwb for each matching TDT folder.
+    """
+    session_date = metadata["session_dates"][index]
+    if "record_fibers" in metadata:
+        record_fiber = metadata["record_fibers"][index]
+    else:
+        record_fiber = None
+
+    # The subject metadata is the same for all the TDT folders of the session, so it is only looked up once
+    sex = metadata["sex"]
+    dob = metadata["dob"]
+    optogenetic_site_name = metadata["optogenetic_site_name"]
+    optogenetic_virus_volume_in_uL = metadata["optogenetic_virus_volume_in_uL"]
+    fiber_photometry_site_name = metadata.get("fiber_photometry_site_name", None)
+    fiber_photometry_virus_volume_in_uL = metadata.get("fiber_photometry_virus_volume_in_uL", None)
+
+    session_to_nwb_kwargs_per_session = []
+    session_date_str = session_date.strftime("%y%m%d")
+    outer_session_folder_name = f"{subject_id}-{session_date_str}"
+    matched = False
+    for tdt_folder in subject_id_and_date_to_tdt_folders.get((subject_id, session_date_str), []):
+        matched = True
+        session_folder = _get_first_entry(folder_path=tdt_folder)
+        inner_session_folder = _get_first_entry(folder_path=session_folder)
+
+        info_file_path = inner_session_folder / "Info.mat"
+        tdt_fp_folder_path = inner_session_folder
+        tdt_ephys_folder_path = session_folder
+
+        # Handle double-subject sessions (ex. M301_M302-241018-072001)
+        first_subject_id, subject_id_separator, _ = tdt_folder.name.partition("-")[0].partition("_")
+        is_double_subject = bool(subject_id_separator)
+        if is_double_subject:
+            if subject_id == first_subject_id:
+                subject_number = 1
+            else:
+                subject_number = 2
+        else:
+            subject_number = 1
+        cam_number = subject_number
+        stream_number = subject_number
+        video_file_path = _get_first_entry(folder_path=inner_session_folder, suffix=f"Cam{cam_number}.avi")
+        stream_name = f"LFP{stream_number}"
+        if record_fiber is None:
+            record_fiber = subject_number
+
+        session_to_nwb_kwargs = dict(
+            info_file_path=info_file_path,
+            video_file_path=video_file_path,
+            tdt_fp_folder_path=tdt_fp_folder_path,
+            tdt_ephys_folder_path=tdt_ephys_folder_path,
+            subject_id=subject_id,
+            sex=sex,
+            dob=dob,
+            optogenetic_site_name=optogenetic_site_name,
+            fiber_photometry_site_name=fiber_photometry_site_name,
+            stream_name=stream_name,
+            record_fiber=record_fiber,
+            optogenetic_virus_volume_in_uL=optogenetic_virus_volume_in_uL,
+            fiber_photometry_virus_volume_in_uL=fiber_photometry_virus_volume_in_uL,
+            metadata_subfolder_name=metadata_subfolder_name,
+        )
+        session_to_nwb_kwargs_per_session.append(session_to_nwb_kwargs)
+    if not matched:
+        raise ValueError(f"No matching TDT folder found for {outer_session_folder_name} in sheet {sheet_name}")
 
     return session_to_nwb_kwargs_per_session
 
@@ -347,13 +626,12 @@ if __name__ == "__main__":
     output_dir_path = Path("/Volumes/T7/CatalystNeuro/Dan/conversion_nwb/huang_2025_001617")
     max_workers = 10
     verbose = False
-
-    if output_dir_path.exists():
-        shutil.rmtree(output_dir_path)
+    overwrite = False
 
     dataset_to_nwb(
         data_dir_path=data_dir_path,
         output_dir_path=output_dir_path,
         max_workers=max_workers,
         verbose=verbose,
+        overwrite=overwrite,
     )
@@ -1,19 +1,158 @@
 """Primary script to run to convert an entire session for of data using the NWBConverter."""
-import copy
 import datetime
-import shutil
+import os
+from concurrent.futures import ProcessPoolExecutor
+from copy import deepcopy
+from functools import lru_cache
 from pathlib import Path
 from typing import Literal
-from zoneinfo import ZoneInfo
 
 import pandas as pd
 from pydantic import DirectoryPath, FilePath
-from pymatreader import read_mat
 
 from dan_lab_to_nwb.huang_2025_001617 import Huang2025NWBConverter
+from dan_lab_to_nwb.utils import (
+    PST,
+    configure_electrical_series_datasets,
+    parse_tdt_start_time,
+    parse_tdt_utc_start_time,
+    read_csv_with_parquet_cache,
+    read_mat_struct,
+)
+from neuroconv.tools.nwb_helpers import configure_and_write_nwbfile
 from neuroconv.utils import dict_deep_update, load_dict_from_file
 
 
+@lru_cache(maxsize=128)
+def _parse_dob(dob: str) -> datetime.datetime:
+    """
+    Parse a date of birth from the metadata sheets (e.g. '04/25/2024') into a Pacific-time datetime.
+
+    Parameters
+    ----------
+    dob : str
+        Date of birth formatted as '%m/%d/%Y'.
+
+    Returns
+    -------
+    datetime.datetime
+        The date of birth localized to US/Pacific.
+    """
+    month, day, year = dob.split("/")  # much cheaper than datetime.strptime for this fixed format
+    return datetime.datetime(int(year), int(month), int(day), tzinfo=PST)
+
+
+def read_info(info_file_path: str) -> dict:
+    """
+    Read (and cache) the 'Info' struct of a TDT Info.mat file.
+
+    The same Info.mat is read when naming the output file and when converting the session,
+    so it is only parsed once per process (until the file is modified).
+
+    Parameters
+    ----------
+    info_file_path : str
+        Path to the Info.mat file.
+
+    Returns
+    -------
+    dict
+        The 'Info' struct (block name, start time, ...). It must not be modified.
+    """
+    info_file_path = str(info_file_path)
+    return _read_info(info_file_path=info_file_path, mtime=Path(info_file_path).stat().st_mtime)
+
+
+@lru_cache(maxsize=128)
+def _read_info(info_file_path: str, mtime: float) -> dict:
+    """
+    Read (and cache) the 'Info' struct of a TDT Info.mat file, keyed on its path and modification time.
+
+    Parameters
+    ----------
+    info_file_path : str
+        Path to the Info.mat file.
+    mtime : float
+        Modification time of the file, so that edits invalidate the cache.
+
+    Returns
+    -------
+    dict
+        The 'Info' struct. It must not be modified.
+    """
+    return read_mat_struct(file_path=info_file_path, variable_name="Info", in_memory=True)  # small file, one read
+
+
+@lru_cache(maxsize=4)
+def _load_editable_metadata(editable_metadata_path: str, mtime: float) -> dict:
+    """
+    Load (and cache) the editable metadata .yaml file.
+
+    Parameters
+    ----------
+    editable_metadata_path : str
+        Path to the editable metadata .yaml file.
+    mtime : float
+        Modification time of the file, so that edits invalidate the cache.
+
+    Returns
+    -------
+    dict
+        The editable metadata. It must be copied before being modified.
+    """
+    return load_dict_from_file(editable_metadata_path)
+
+
+def _read_subject_metadata(file_path: FilePath) -> pd.DataFrame:
+    """
+    Read (and cache) a subject metadata sheet indexed by 'mouse ID', with its 'virus volume' columns converted from
+    nL strings (e.g. '300nL') to uL.
+
+    The example sessions of main() share sheets, so each sheet is only parsed once per process, and the row of each
+    subject is a hash lookup (metadata_df.loc[subject_id]) rather than a scan of the sheet.
+
+    Parameters
+    ----------
+    file_path : FilePath
+        Path to the subject metadata .csv file.
+
+    Returns
+    -------
+    pd.DataFrame
+        The subject metadata (first row per 'mouse ID') with every 'virus volume' column as floats in microliters.
+        It must not be modified.
+    """
+    file_path = str(file_path)
+    return _read_subject_metadata_cached(file_path=file_path, mtime=Path(file_path).stat().st_mtime)
+
+
+@lru_cache(maxsize=16)
+def _read_subject_metadata_cached(file_path: str, mtime: float) -> pd.DataFrame:
+    """
+    Read a subject metadata sheet (see _read_subject_metadata), keyed on its path and modification time.
+
+    Parameters
+    ----------
+    file_path : str
+        Path to the subject metadata .csv file.
+    mtime : float
+        Modification time of the file, so that edits invalidate the cache.
+
+    Returns
+    -------
+    pd.DataFrame
+        The subject metadata indexed by 'mouse ID', with every 'virus volume' column as floats in microliters.
+    """
+    metadata_df = read_csv_with_parquet_cache(file_path)
+    virus_volume_column_names = [name for name in metadata_df.columns if name.startswith("virus volume")]
+    virus_volumes_in_uL = {
+        name: pd.to_numeric(metadata_df[name].astype(str).str.replace("nL", "", regex=False), errors="coerce") / 1000.0
+        for name in virus_volume_column_names
+    }
+    metadata_df = metadata_df.assign(**virus_volumes_in_uL)
+    return metadata_df.drop_duplicates(subset="mouse ID").set_index("mouse ID")
+
+
 def session_to_nwb(
     *,
     info_file_path: FilePath,
@@ -35,6 +174,10 @@ def session_to_nwb(
     stub_test: bool = False,
     verbose: bool = True,
     skip_fiber_photometry: bool = False,
+    ephys_iterator_opts: dict | None = None,
+    ephys_compression: Literal["gzip", "blosc-zstd"] = "gzip",
+    metadata_only: bool = False,
+    overwrite: bool = False,
 ):
     """
     Convert a single session with fiber photometry, optogenetics, and electrophysiology data to NWB.
@@ -87,6 +230,21 @@ def session_to_nwb(
         If True, print progress messages during conversion.
     skip_fiber_photometry : bool, default: False
         If True, skip fiber photometry data conversion (for behavioral-only sessions).
+    ephys_iterator_opts : dict or None, default: None
+        Options for the data chunk iterator of the EEG and EMG series (e.g. dict(buffer_gb=1.0, chunk_mb=16.0)).
+        Larger buffers and chunks mean fewer, larger reads from the TDT files and writes to the NWB file.
+        See https://hdmf.readthedocs.io/en/stable/hdmf.data_utils.html#hdmf.data_utils.GenericDataChunkIterator
+        for the full list of options. By default, the iterator defaults are used.
+    ephys_compression : "gzip" or "blosc-zstd", default: "gzip"
+        The compression of the EEG and EMG datasets (see configure_electrical_series_datasets). "blosc-zstd" is faster
+        than gzip, but the file can then only be read where hdf5plugin is installed.
+    metadata_only : bool, default: False
+        If True, stop once the metadata of the session is assembled and validated, without reading the bulk data or
+        writing the NWB file. This quickly checks the Info.mat files, metadata and paths of a batch of sessions.
+    overwrite : bool, default: False
+        If True, convert the session again even if its NWB file already exists in output_dir_path. By default, the
+        session is skipped, so that re-running a batch only converts the sessions that are missing. The NWB file is
+        only renamed into place once complete, so an existing NWB file is never partial.
 
     Returns
     -------
@@ -112,7 +270,27 @@ def session_to_nwb(
     tdt_fp_folder_path = Path(tdt_fp_folder_path)
     tdt_ephys_folder_path = Path(tdt_ephys_folder_path)
     output_dir_path = Path(output_dir_path)
-    output_dir_path.mkdir(parents=True, exist_ok=True)
+
+    info = read_info(info_file_path=str(info_file_path))
+    session_id = info["blockname"]
+    if "Start" in info:
+        session_start_time = parse_tdt_start_time(start=info["Start"], tzinfo=PST)
+    else:
+        session_start_time = parse_tdt_utc_start_time(
+            date=info["date"], utc_start_time=info["utcStartTime"], tzinfo=PST  # 2025-Apr-09 14:10:06
+        )
+    if metadata_subfolder_name == "opto-signal sum":
+        session_type = "opto-signal"
+    elif metadata_subfolder_name == "opto-behavioral sum":
+        session_type = "opto-behavioral"
+    else:
+        raise ValueError(f"Unrecognized metadata_subfolder_name: {metadata_subfolder_name}")
+    session_id = f"{session_id}-{session_type}"
+    nwbfile_path = output_dir_path / f"sub-{subject_id}_ses-{session_id}.nwb"
+    if nwbfile_path.exists() and not overwrite and not metadata_only:
+        if verbose:
+            print(f"Session {session_id} for subject {subject_id} is skipped, since {nwbfile_path} already exists")
+        return
 
     source_data = dict()
     conversion_options = dict()
@@ -126,6 +304,9 @@ def session_to_nwb(
         folder_path=tdt_ephys_folder_path, gain=1.0, stream_name=stream_name, es_key="ElectricalSeriesEMG"
     )
     conversion_options["EMG"] = dict(stub_test=stub_test, group_names=["ElectrodeGroupEMG"])
+    if ephys_iterator_opts is not None:
+        conversion_options["EEG"]["iterator_opts"] = ephys_iterator_opts
+        conversion_options["EMG"]["iterator_opts"] = ephys_iterator_opts
 
     # Add Fiber Photometry
     if not skip_fiber_photometry:
@@ -137,6 +318,8 @@ def session_to_nwb(
         video_name = "Video1"
     elif "Cam2" in video_file_path.name:
         video_name = "Video2"
+    else:
+        raise ValueError(f"Unrecognized camera in video file name: {video_file_path.name}")
     source_data["Video"] = dict(file_paths=[video_file_path], video_name=video_name)
     conversion_options["Video"] = dict()
 
@@ -155,27 +338,14 @@ def session_to_nwb(
 
     # Update default metadata with the editable in the corresponding yaml file
     editable_metadata_path = Path(__file__).parent / "huang_2025_001617_metadata.yaml"
-    editable_metadata = load_dict_from_file(editable_metadata_path)
-    metadata = dict_deep_update(metadata, editable_metadata)
+    editable_metadata = deepcopy(
+        _load_editable_metadata(
+            editable_metadata_path=str(editable_metadata_path), mtime=editable_metadata_path.stat().st_mtime
+        )
+    )
+    # The converter metadata is built fresh for this session, so it is updated in place rather than copied again
+    metadata = dict_deep_update(metadata, editable_metadata, copy=False)
 
-    info = read_mat(filename=info_file_path)["Info"]
-    session_id = info["blockname"]
-    pst = ZoneInfo("US/Pacific")
-    if "Start" in info:
-        session_start_time = datetime.datetime.strptime(info["Start"], "%I:%M:%S%p %m/%d/%Y").replace(tzinfo=pst)
-    else:
-        date = datetime.datetime.strptime(info["date"], "%Y-%b-%d").date()  # 2025-Apr-09
-        time = datetime.datetime.strptime(info["utcStartTime"], "%H:%M:%S").time()  # 14:10:06
-        session_start_time_utc = datetime.datetime.combine(date, time).replace(tzinfo=datetime.timezone.utc)
-        session_start_time = session_start_time_utc.astimezone(pst)
-    if metadata_subfolder_name == "opto-signal sum":
-        session_type = "opto-signal"
-    elif metadata_subfolder_name == "opto-behavioral sum":
-        session_type = "opto-behavioral"
-    else:
-        raise ValueError(f"Unrecognized metadata_subfolder_name: {metadata_subfolder_name}")
-    session_id = f"{session_id}-{session_type}"
-    nwbfile_path = output_dir_path / f"sub-{subject_id}_ses-{session_id}.nwb"
     metadata["NWBFile"]["session_id"] = session_id
     metadata["Subject"]["subject_id"] = subject_id
     metadata["Subject"]["sex"] = sex
@@ -184,8 +354,13 @@ def session_to_nwb(
 
     if not skip_fiber_photometry:
         # Update metadata with session-specific details for Fiber Photometry
+        # Only the entries of the recorded site are kept, and updated in place since the metadata belongs to this call
         fp_metadata = metadata["Ophys"]["FiberPhotometry"]
-        filtered_fp_metadata = copy.deepcopy(fp_metadata)
+        record_fiber_to_stream_suffix = {1: "B", 2: "C"}
+        if record_fiber not in record_fiber_to_stream_suffix:
+            raise ValueError(f"Unrecognized record_fiber value: {record_fiber}")
+        stream_suffix = record_fiber_to_stream_suffix[record_fiber]
+        filtered_fp_metadata = dict(fp_metadata)
         filtered_fp_metadata["OpticalFibers"] = [
             fiber for fiber in fp_metadata["OpticalFibers"] if fiber_photometry_site_name in fiber["name"]
         ]
@@ -194,48 +369,61 @@ def session_to_nwb(
         ]
         filtered_fp_metadata["FiberPhotometryVirusInjections"] = []
         for injection_meta in fp_metadata["FiberPhotometryVirusInjections"]:
-            injection_meta["volume_in_uL"] = fiber_photometry_virus_volume_in_uL
             if fiber_photometry_site_name in injection_meta["name"]:
+                injection_meta["volume_in_uL"] = fiber_photometry_virus_volume_in_uL
                 filtered_fp_metadata["FiberPhotometryVirusInjections"].append(injection_meta)
         filtered_fp_metadata["FiberPhotometryIndicators"] = [
             indicator
             for indicator in fp_metadata["FiberPhotometryIndicators"]
             if fiber_photometry_site_name in indicator["name"]
         ]
-        filtered_fp_metadata["FiberPhotometryTable"]["rows"] = [
-            row for row in fp_metadata["FiberPhotometryTable"]["rows"] if fiber_photometry_site_name in row["location"]
-        ]
-        filtered_fp_metadata["FiberPhotometryResponseSeries"] = [
-            series
-            for series in fp_metadata["FiberPhotometryResponseSeries"]
-            if fiber_photometry_site_name in series["name"]
-        ]
-        if record_fiber == 1:
-            for series_meta in filtered_fp_metadata["FiberPhotometryResponseSeries"]:
-                if "calcium_signal" in series_meta["name"]:
-                    series_meta["stream_name"] = "_465B"
-                    series_meta["fiber_photometry_table_region"] = [0]
-                elif "isosbestic_control" in series_meta["name"]:
-                    series_meta["stream_name"] = "_405B"
-                    series_meta["fiber_photometry_table_region"] = [1]
-                else:
-                    raise ValueError(f"Unrecognized Fiber Photometry series name: {series_meta['name']}")
-        elif record_fiber == 2:
-            for series_meta in filtered_fp_metadata["FiberPhotometryResponseSeries"]:
-                if "calcium_signal" in series_meta["name"]:
-                    series_meta["stream_name"] = "_465C"
-                    series_meta["fiber_photometry_table_region"] = [0]
-                elif "isosbestic_control" in series_meta["name"]:
-                    series_meta["stream_name"] = "_405C"
-                    series_meta["fiber_photometry_table_region"] = [1]
-                else:
-                    raise ValueError(f"Unrecognized Fiber Photometry series name: {series_meta['name']}")
-        else:
-            raise ValueError(f"Unrecognized record_fiber value: {record_fiber}")
+        filtered_fp_metadata["FiberPhotometryTable"] = dict(
+            fp_metadata["FiberPhotometryTable"],
+            rows=[
+                row
+                for row in fp_metadata["FiberPhotometryTable"]["rows"]
+                if fiber_photometry_site_name in row["location"]
+            ],
+        )
+        filtered_fp_metadata["FiberPhotometryResponseSeries"] = []
+        for series_meta in fp_metadata["FiberPhotometryResponseSeries"]:
+            if fiber_photometry_site_name not in series_meta["name"]:
+                continue
+            if "calcium_signal" in series_meta["name"]:
+                series_meta["stream_name"] = f"_465{stream_suffix}"
+                series_meta["fiber_photometry_table_region"] = [0]
+            elif "isosbestic_control" in series_meta["name"]:
+                series_meta["stream_name"] = f"_405{stream_suffix}"
+                series_meta["fiber_photometry_table_region"] = [1]
+            else:
+                raise ValueError(f"Unrecognized Fiber Photometry series name: {series_meta['name']}")
+            filtered_fp_metadata["FiberPhotometryResponseSeries"].append(series_meta)
         metadata["Ophys"]["FiberPhotometry"] = filtered_fp_metadata
 
+    if metadata_only:
+        converter.validate_metadata(metadata=metadata)
+        if verbose:
+            print(f"Session {session_id} for subject {subject_id} (start {session_start_time}) has valid metadata")
+        return
+
     # Run conversion
-    converter.run_conversion(metadata=metadata, nwbfile_path=nwbfile_path, conversion_options=conversion_options)
+    if not output_dir_path.is_dir():  # main() and dataset_to_nwb create it once for all sessions
+        output_dir_path.mkdir(parents=True, exist_ok=True)
+    # The steps of run_conversion, so that the chunking and compression of the EEG and EMG datasets are set once in
+    # the backend configuration of the file
+    converter.validate_metadata(metadata=metadata)
+    converter.validate_conversion_options(conversion_options=conversion_options)
+    converter.temporally_align_data_interfaces(metadata=metadata, conversion_options=conversion_options)
+    nwbfile = converter.create_nwbfile(metadata=metadata, conversion_options=conversion_options)
+    backend_configuration = converter.get_default_backend_configuration(nwbfile=nwbfile, backend="hdf5")
+    configure_electrical_series_datasets(backend_configuration=backend_configuration, compression=ephys_compression)
+    # Write to a temporary file that is only renamed once complete, so that an existing NWB file is always complete
+    # (an interrupted run leaves the temporary file, which is overwritten by the next run)
+    partial_nwbfile_path = nwbfile_path.with_name(f".{nwbfile_path.stem}.partial.nwb")
+    configure_and_write_nwbfile(
+        nwbfile=nwbfile, nwbfile_path=partial_nwbfile_path, backend_configuration=backend_configuration
+    )
+    os.replace(partial_nwbfile_path, nwbfile_path)
 
     if verbose:
         print(f"Session {session_id} for subject {subject_id} converted successfully to NWB format at {nwbfile_path}")
@@ -246,536 +434,161 @@ def main():
     data_dir_path = Path("/Volumes/T7/CatalystNeuro/Dan/FP and opto datasets")
     output_dir_path = Path("/Volumes/T7/CatalystNeuro/Dan/conversion_nwb/huang_2025_001617")
     stub_test = False
+    metadata_only = False  # set to True to check the metadata of the example sessions without converting them
+    overwrite = False  # set to True to convert again the example sessions whose NWB file already exists
 
-    if output_dir_path.exists():
-        shutil.rmtree(output_dir_path)
-
-    # opto-signal sum Example Sessions
-    # ------------------------------------------------------------------------------------------------------------------
-
-    # Setup - Bing
-    metadata_df = pd.read_csv(
-        data_dir_path / "metadata" / "opto-signal sum" / "FP_Dat-cre_mVTA_3h-stim_low virus - Sheet1.csv"
-    )
-    subject_id = "M301"
-    row = metadata_df[metadata_df["mouse ID"] == subject_id].iloc[0]
-    sex = "M" if row["M"] == 1 else "F"
-    pst = ZoneInfo("US/Pacific")
-    dob = datetime.datetime.strptime(row["DOB"], "%m/%d/%Y").replace(tzinfo=pst)
-    optogenetic_site_name = row["Stim region"]
-    date_column_names = [name for name in metadata_df.columns if name.startswith("date")]
-    record_fiber_column_names = [name for name in metadata_df.columns if name.startswith("Record fiber")]
-    session_index = 0
-    date_column_name = date_column_names[session_index]
-    record_fiber_column_name = record_fiber_column_names[session_index]
-    record_fiber = int(row[record_fiber_column_name])
-    fiber_photometry_site_name = row["Record region"]
-    virus_volume_column_names = [name for name in metadata_df.columns if name.startswith("virus volume")]
-    optogenetic_virus_volume_column_name = virus_volume_column_names[0]
-    fiber_photometry_virus_volume_column_name = virus_volume_column_names[1]
-    optogenetic_virus_volume_in_nL = float(
-        row[optogenetic_virus_volume_column_name].replace("nL", "")
-    )  # 300nL --> 300.0
-    optogenetic_virus_volume_in_uL = optogenetic_virus_volume_in_nL / 1000.0
-    fiber_photometry_virus_volume_in_nL = float(
-        row[fiber_photometry_virus_volume_column_name].replace("nL", "")
-    )  # 300nL --> 300.0
-    fiber_photometry_virus_volume_in_uL = fiber_photometry_virus_volume_in_nL / 1000.0
-
-    info_file_path = (
-        data_dir_path
-        / "Setup - Bing"
-        / "202409-old setting"
-        / "M301-240904-072001"
-        / "Lindsay_SBO_op1-E_2in1_pTra_con-240902-231421"
-        / "M301-240904-072001"
-        / "Info.mat"
-    )
-    video_file_path = (
-        data_dir_path
-        / "Setup - Bing"
-        / "202409-old setting"
-        / "M301-240904-072001"
-        / "Lindsay_SBO_op1-E_2in1_pTra_con-240902-231421"
-        / "M301-240904-072001"
-        / "Lindsay_SBO_op1-E_2in1_pTra_con-240902-231421_M301-240904-072001_Cam1.avi"
-    )
-    tdt_fp_folder_path = (
-        data_dir_path
-        / "Setup - Bing"
-        / "202409-old setting"
-        / "M301-240904-072001"
-        / "Lindsay_SBO_op1-E_2in1_pTra_con-240902-231421"
-        / "M301-240904-072001"
-    )
-    tdt_ephys_folder_path = (
-        data_dir_path
-        / "Setup - Bing"
-        / "202409-old setting"
-        / "M301-240904-072001"
-        / "Lindsay_SBO_op1-E_2in1_pTra_con-240902-231421"
-    )
-    session_to_nwb(
-        info_file_path=info_file_path,
-        video_file_path=video_file_path,
-        tdt_fp_folder_path=tdt_fp_folder_path,
-        record_fiber=record_fiber,
-        tdt_ephys_folder_path=tdt_ephys_folder_path,
-        output_dir_path=output_dir_path,
-        subject_id=subject_id,
-        sex=sex,
-        dob=dob,
-        optogenetic_site_name=optogenetic_site_name,
-        fiber_photometry_site_name=fiber_photometry_site_name,
-        stub_test=stub_test,
-        stream_name="LFP1",
-        optogenetic_virus_volume_in_uL=optogenetic_virus_volume_in_uL,
-        fiber_photometry_virus_volume_in_uL=fiber_photometry_virus_volume_in_uL,
-        metadata_subfolder_name="opto-signal sum",
-    )
-
-    # Setup - WS8
-    metadata_df = pd.read_csv(
-        data_dir_path / "metadata" / "opto-signal sum" / "FP_Dat-cre_mVTA_3h-stim_low virus - Sheet1.csv"
-    )
-    subject_id = "M296"
-    row = metadata_df[metadata_df["mouse ID"] == subject_id].iloc[0]
-    sex = "M" if row["M"] == 1 else "F"
-    pst = ZoneInfo("US/Pacific")
-    dob = datetime.datetime.strptime(row["DOB"], "%m/%d/%Y").replace(tzinfo=pst)
-    optogenetic_site_name = row["Stim region"]
-    date_column_names = [name for name in metadata_df.columns if name.startswith("date")]
-    record_fiber_column_names = [name for name in metadata_df.columns if name.startswith("Record fiber")]
-    session_index = 0
-    date_column_name = date_column_names[session_index]
-    record_fiber_column_name = record_fiber_column_names[session_index]
-    record_fiber = int(row[record_fiber_column_name])
-    fiber_photometry_site_name = row["Record region"]
-    virus_volume_column_names = [name for name in metadata_df.columns if name.startswith("virus volume")]
-    optogenetic_virus_volume_column_name = virus_volume_column_names[0]
-    fiber_photometry_virus_volume_column_name = virus_volume_column_names[1]
-    optogenetic_virus_volume_in_nL = float(
-        row[optogenetic_virus_volume_column_name].replace("nL", "")
-    )  # 300nL --> 300.0
-    optogenetic_virus_volume_in_uL = optogenetic_virus_volume_in_nL / 1000.0
-    fiber_photometry_virus_volume_in_nL = float(
-        row[fiber_photometry_virus_volume_column_name].replace("nL", "")
-    )  # 300nL --> 300.0
-    fiber_photometry_virus_volume_in_uL = fiber_photometry_virus_volume_in_nL / 1000.0
-    info_file_path = (
-        data_dir_path
-        / "Setup - WS8"
-        / "202410"
-        / "M296-241018-072001"
-        / "Lindsay_SBO_op1-E_2in1_pTra_con-241017-190451"
-        / "M296-241018-072001"
-        / "Info.mat"
-    )
-    video_file_path = (
-        data_dir_path
-        / "Setup - WS8"
-        / "202410"
-        / "M296-241018-072001"
-        / "Lindsay_SBO_op1-E_2in1_pTra_con-241017-190451"
-        / "M296-241018-072001"
-        / "Lindsay_SBO_op1-E_2in1_pTra_con-241017-190451_M296-241018-072001_Cam1.avi"
-    )
-    tdt_fp_folder_path = (
-        data_dir_path
-        / "Setup - WS8"
-        / "202410"
-        / "M296-241018-072001"
-        / "Lindsay_SBO_op1-E_2in1_pTra_con-241017-190451"
-        / "M296-241018-072001"
-    )
-    tdt_ephys_folder_path = (
-        data_dir_path
-        / "Setup - WS8"
-        / "202410"
-        / "M296-241018-072001"
-        / "Lindsay_SBO_op1-E_2in1_pTra_con-241017-190451"
-    )
-    session_to_nwb(
-        info_file_path=info_file_path,
-        video_file_path=video_file_path,
-        tdt_fp_folder_path=tdt_fp_folder_path,
-        record_fiber=record_fiber,
-        tdt_ephys_folder_path=tdt_ephys_folder_path,
-        stream_name="LFP1",
-        output_dir_path=output_dir_path,
-        subject_id=subject_id,
-        sex=sex,
-        dob=dob,
-        optogenetic_site_name=optogenetic_site_name,
-        fiber_photometry_site_name=fiber_photometry_site_name,
-        optogenetic_virus_volume_in_uL=optogenetic_virus_volume_in_uL,
-        fiber_photometry_virus_volume_in_uL=fiber_photometry_virus_volume_in_uL,
-        stub_test=stub_test,
-        metadata_subfolder_name="opto-signal sum",
-    )
-
-    # Setup - MollyFP first subject
-    # Note: this example session actually contains data from two subjects, but only one is included in the NWB file.
-    metadata_df = pd.read_csv(
-        data_dir_path / "metadata" / "opto-signal sum" / "FP_Sert-cre_DRN_2min-pTra-stim - Sheet1.csv"
-    )
-    subject_id = "M363"
-    row = metadata_df[metadata_df["mouse ID"] == subject_id].iloc[0]
-    sex = "M" if row["M"] == 1 else "F"
-    pst = ZoneInfo("US/Pacific")
-    dob = datetime.datetime.strptime(row["DOB"], "%m/%d/%Y").replace(tzinfo=pst)
-    optogenetic_site_name = row["Stim region"]
-    fiber_photometry_site_name = row["Record region"]
-    record_fiber = 1
-    shared_test_pulse = True
-    virus_volume_column_names = [name for name in metadata_df.columns if name.startswith("virus volume")]
-    optogenetic_virus_volume_column_name = virus_volume_column_names[0]
-    fiber_photometry_virus_volume_column_name = virus_volume_column_names[1]
-    optogenetic_virus_volume_in_nL = float(
-        row[optogenetic_virus_volume_column_name].replace("nL", "")
-    )  # 300nL --> 300.0
-    optogenetic_virus_volume_in_uL = optogenetic_virus_volume_in_nL / 1000.0
-    fiber_photometry_virus_volume_in_nL = float(
-        row[fiber_photometry_virus_volume_column_name].replace("nL", "")
-    )  # 300nL --> 300.0
-    fiber_photometry_virus_volume_in_uL = fiber_photometry_virus_volume_in_nL / 1000.0
-    info_file_path = (
-        data_dir_path
-        / "Setup - MollyFP"
-        / "MollyFP-202508"
-        / "M363_M366-250822-153604"
-        / "A_Lindsay_TDTm_op1_pTra_2min-250822-153604"
-        / "M363_M366-250822-153604"
-        / "Info.mat"
-    )
-    video_file_path = (
-        data_dir_path
-        / "Setup - MollyFP"
-        / "MollyFP-202508"
-        / "M363_M366-250822-153604"
-        / "A_Lindsay_TDTm_op1_pTra_2min-250822-153604"
-        / "M363_M366-250822-153604"
-        / "A_Lindsay_TDTm_op1_pTra_2min-250822-153604_M363_M366-250822-153604_Cam1.avi"
-    )
-    tdt_fp_folder_path = (
-        data_dir_path
-        / "Setup - MollyFP"
-        / "MollyFP-202508"
-        / "M363_M366-250822-153604"
-        / "A_Lindsay_TDTm_op1_pTra_2min-250822-153604"
-        / "M363_M366-250822-153604"
-    )
-    tdt_ephys_folder_path = (
-        data_dir_path
-        / "Setup - MollyFP"
-        / "MollyFP-202508"
-        / "M363_M366-250822-153604"
-        / "A_Lindsay_TDTm_op1_pTra_2min-250822-153604"
-    )
-    session_to_nwb(
-        info_file_path=info_file_path,
-        video_file_path=video_file_path,
-        tdt_fp_folder_path=tdt_fp_folder_path,
-        tdt_ephys_folder_path=tdt_ephys_folder_path,
-        stream_name="LFP1",
-        output_dir_path=output_dir_path,
-        subject_id=subject_id,
-        sex=sex,
-        dob=dob,
-        optogenetic_site_name=optogenetic_site_name,
-        fiber_photometry_site_name=fiber_photometry_site_name,
-        record_fiber=record_fiber,
-        optogenetic_virus_volume_in_uL=optogenetic_virus_volume_in_uL,
-        fiber_photometry_virus_volume_in_uL=fiber_photometry_virus_volume_in_uL,
-        shared_test_pulse=shared_test_pulse,
-        stub_test=stub_test,
-        metadata_subfolder_name="opto-signal sum",
-    )
+    output_dir_path.mkdir(parents=True, exist_ok=True)
 
-    # Setup - MollyFP second subject
-    # Note: this example session actually contains data from two subjects, but only one is included in the NWB file.
-    metadata_df = pd.read_csv(
-        data_dir_path / "metadata" / "opto-signal sum" / "FP_Sert-cre_DRN_2min-pTra-stim - Sheet1.csv"
-    )
-    subject_id = "M366"
-    row = metadata_df[metadata_df["mouse ID"] == subject_id].iloc[0]
-    sex = "M" if row["M"] == 1 else "F"
-    pst = ZoneInfo("US/Pacific")
-    dob = datetime.datetime.strptime(row["DOB"], "%m/%d/%Y").replace(tzinfo=pst)
-    optogenetic_site_name = row["Stim region"]
-    fiber_photometry_site_name = row["Record region"]
-    record_fiber = 2
-    shared_test_pulse = True
-    virus_volume_column_names = [name for name in metadata_df.columns if name.startswith("virus volume")]
-    optogenetic_virus_volume_column_name = virus_volume_column_names[0]
-    fiber_photometry_virus_volume_column_name = virus_volume_column_names[1]
-    optogenetic_virus_volume_in_nL = float(
-        row[optogenetic_virus_volume_column_name].replace("nL", "")
-    )  # 300nL --> 300.0
-    optogenetic_virus_volume_in_uL = optogenetic_virus_volume_in_nL / 1000.0
-    fiber_photometry_virus_volume_in_nL = float(
-        row[fiber_photometry_virus_volume_column_name].replace("nL", "")
-    )  # 300nL --> 300.0
-    fiber_photometry_virus_volume_in_uL = fiber_photometry_virus_volume_in_nL / 1000.0
-    info_file_path = (
-        data_dir_path
-        / "Setup - MollyFP"
-        / "MollyFP-202508"
-        / "M363_M366-250822-153604"
-        / "A_Lindsay_TDTm_op1_pTra_2min-250822-153604"
-        / "M363_M366-250822-153604"
-        / "Info.mat"
-    )
-    video_file_path = (
-        data_dir_path
-        / "Setup - MollyFP"
-        / "MollyFP-202508"
-        / "M363_M366-250822-153604"
-        / "A_Lindsay_TDTm_op1_pTra_2min-250822-153604"
-        / "M363_M366-250822-153604"
-        / "A_Lindsay_TDTm_op1_pTra_2min-250822-153604_M363_M366-250822-153604_Cam2.avi"
-    )
-    tdt_fp_folder_path = (
-        data_dir_path
-        / "Setup - MollyFP"
-        / "MollyFP-202508"
-        / "M363_M366-250822-153604"
-        / "A_Lindsay_TDTm_op1_pTra_2min-250822-153604"
-        / "M363_M366-250822-153604"
-    )
-    tdt_ephys_folder_path = (
-        data_dir_path
-        / "Setup - MollyFP"
-        / "MollyFP-202508"
-        / "M363_M366-250822-153604"
-        / "A_Lindsay_TDTm_op1_pTra_2min-250822-153604"
-    )
-    session_to_nwb(
-        info_file_path=info_file_path,
-        video_file_path=video_file_path,
-        tdt_fp_folder_path=tdt_fp_folder_path,
-        tdt_ephys_folder_path=tdt_ephys_folder_path,
-        stream_name="LFP2",
-        output_dir_path=output_dir_path,
-        subject_id=subject_id,
-        sex=sex,
-        dob=dob,
-        optogenetic_site_name=optogenetic_site_name,
-        fiber_photometry_site_name=fiber_photometry_site_name,
-        record_fiber=record_fiber,
-        shared_test_pulse=shared_test_pulse,
-        optogenetic_virus_volume_in_uL=optogenetic_virus_volume_in_uL,
-        fiber_photometry_virus_volume_in_uL=fiber_photometry_virus_volume_in_uL,
-        stub_test=stub_test,
-        metadata_subfolder_name="opto-signal sum",
-    )
+    # Example Sessions
+    # Each TDT block is stored as <setup>/<month>/<block>/<experiment>/<block>, with its video
+    # <experiment>_<block>_<camera>.avi inside the block folder. If record_fiber is omitted, it is read from the
+    # metadata sheet. Note: the MollyFP opto-signal sum session contains data from two subjects, with one per NWB file.
+    example_sessions = [
+        # opto-signal sum
+        dict(
+            setup_folder_name="Setup - Bing",
+            month_folder_name="202409-old setting",
+            block_name="M301-240904-072001",
+            experiment_name="Lindsay_SBO_op1-E_2in1_pTra_con-240902-231421",
+            camera_name="Cam1",
+            stream_name="LFP1",
+            subject_id="M301",
+            metadata_subfolder_name="opto-signal sum",
+            metadata_file_name="FP_Dat-cre_mVTA_3h-stim_low virus - Sheet1.csv",
+        ),
+        dict(
+            setup_folder_name="Setup - WS8",
+            month_folder_name="202410",
+            block_name="M296-241018-072001",
+            experiment_name="Lindsay_SBO_op1-E_2in1_pTra_con-241017-190451",
+            camera_name="Cam1",
+            stream_name="LFP1",
+            subject_id="M296",
+            metadata_subfolder_name="opto-signal sum",
+            metadata_file_name="FP_Dat-cre_mVTA_3h-stim_low virus - Sheet1.csv",
+        ),
+        dict(
+            setup_folder_name="Setup - MollyFP",
+            month_folder_name="MollyFP-202508",
+            block_name="M363_M366-250822-153604",
+            experiment_name="A_Lindsay_TDTm_op1_pTra_2min-250822-153604",
+            camera_name="Cam1",
+            stream_name="LFP1",
+            subject_id="M363",
+            metadata_subfolder_name="opto-signal sum",
+            metadata_file_name="FP_Sert-cre_DRN_2min-pTra-stim - Sheet1.csv",
+            record_fiber=1,
+            shared_test_pulse=True,
+        ),
+        dict(
+            setup_folder_name="Setup - MollyFP",
+            month_folder_name="MollyFP-202508",
+            block_name="M363_M366-250822-153604",
+            experiment_name="A_Lindsay_TDTm_op1_pTra_2min-250822-153604",
+            camera_name="Cam2",
+            stream_name="LFP2",
+            subject_id="M366",
+            metadata_subfolder_name="opto-signal sum",
+            metadata_file_name="FP_Sert-cre_DRN_2min-pTra-stim - Sheet1.csv",
+            record_fiber=2,
+            shared_test_pulse=True,
+        ),
+        # opto-behavioral sum
+        dict(
+            setup_folder_name="Setup - Bing",
+            month_folder_name="202408-old setting",
+            block_name="M008-240819-071001",
+            experiment_name="Lindsay_SBO_opto1-Evoke12_2in1-240817-154318",
+            camera_name="Cam1",
+            stream_name="LFP1",
+            subject_id="M008",
+            metadata_subfolder_name="opto-behavioral sum",
+            metadata_file_name="behav_ChAT-cre_BF_2min-20Hz-stim - Sheet1.csv",
+            record_fiber=1,
+        ),
+        dict(
+            setup_folder_name="Setup - WS8",
+            month_folder_name="WS8-202506",
+            block_name="M361_M337-250609-081001",
+            experiment_name="A_Lindsay_SBO_opto1_E_2miceRand-250609-081001",
+            camera_name="Cam2",
+            stream_name="LFP2",
+            subject_id="M337",
+            metadata_subfolder_name="opto-behavioral sum",
+            metadata_file_name="behav_ChAT-cre_BF_2min-20Hz-stim - Sheet1.csv",
+            record_fiber=2,
+        ),
+        dict(
+            setup_folder_name="Setup - MollyFP",
+            month_folder_name="MollyFP-202507",
+            block_name="M363_M364-250722-191039",
+            experiment_name="A_Lindsay_TDTm_op1_pTra_2min-250722-190941",
+            camera_name="Cam1",
+            stream_name="LFP2",
+            subject_id="M363",
+            metadata_subfolder_name="opto-behavioral sum",
+            metadata_file_name="behav_Sert-cre_DRN_2min-pTra-stim - Sheet1.csv",
+            record_fiber=1,
+            shared_test_pulse=True,
+        ),
+    ]
+
+    session_to_nwb_kwargs_per_session = []
+    for example_session in example_sessions:
+        subject_id = example_session["subject_id"]
+        metadata_subfolder_name = example_session["metadata_subfolder_name"]
+        metadata_df = _read_subject_metadata(
+            data_dir_path / "metadata" / metadata_subfolder_name / example_session["metadata_file_name"]
+        )
+        row = metadata_df.loc[subject_id]
+        virus_volume_column_names = [name for name in metadata_df.columns if name.startswith("virus volume")]
+
+        block_name = example_session["block_name"]
+        experiment_name = example_session["experiment_name"]
+        tdt_ephys_folder_path = data_dir_path.joinpath(
+            example_session["setup_folder_name"], example_session["month_folder_name"], block_name, experiment_name
+        )
+        tdt_fp_folder_path = tdt_ephys_folder_path / block_name
+        session_to_nwb_kwargs = dict(
+            info_file_path=tdt_fp_folder_path / "Info.mat",
+            video_file_path=tdt_fp_folder_path / f"{experiment_name}_{block_name}_{example_session['camera_name']}.avi",
+            tdt_fp_folder_path=tdt_fp_folder_path,
+            tdt_ephys_folder_path=tdt_ephys_folder_path,
+            stream_name=example_session["stream_name"],
+            output_dir_path=output_dir_path,
+            subject_id=subject_id,
+            sex="M" if row["M"] == 1 else "F",
+            dob=_parse_dob(row["DOB"]),
+            optogenetic_site_name=row["Stim region"],
+            optogenetic_virus_volume_in_uL=row[virus_volume_column_names[0]],
+            stub_test=stub_test,
+            metadata_only=metadata_only,
+            overwrite=overwrite,
+            metadata_subfolder_name=metadata_subfolder_name,
+        )
+        if "record_fiber" in example_session:
+            session_to_nwb_kwargs["record_fiber"] = example_session["record_fiber"]
+        else:  # the first session of the subject in the metadata sheet
+            record_fiber_column_name = next(name for name in metadata_df.columns if name.startswith("Record fiber"))
+            session_to_nwb_kwargs["record_fiber"] = int(row[record_fiber_column_name])
+        if "shared_test_pulse" in example_session:
+            session_to_nwb_kwargs["shared_test_pulse"] = example_session["shared_test_pulse"]
+        if metadata_subfolder_name == "opto-signal sum":
+            session_to_nwb_kwargs["fiber_photometry_site_name"] = row["Record region"]
+            session_to_nwb_kwargs["fiber_photometry_virus_volume_in_uL"] = row[virus_volume_column_names[1]]
+        else:
+            session_to_nwb_kwargs["skip_fiber_photometry"] = True
+        session_to_nwb_kwargs_per_session.append(session_to_nwb_kwargs)
 
-    # opto-behavioral sum Example Sessions
-    # ------------------------------------------------------------------------------------------------------------------
-    # Setup - Bing
-    metadata_df = pd.read_csv(
-        data_dir_path / "metadata" / "opto-behavioral sum" / "behav_ChAT-cre_BF_2min-20Hz-stim - Sheet1.csv"
-    )
-    subject_id = "M008"
-    row = metadata_df[metadata_df["mouse ID"] == subject_id].iloc[0]
-    sex = "M" if row["M"] == 1 else "F"
-    pst = ZoneInfo("US/Pacific")
-    dob = datetime.datetime.strptime(row["DOB"], "%m/%d/%Y").replace(tzinfo=pst)
-    optogenetic_site_name = row["Stim region"]
-    record_fiber = 1
-    virus_volume_column_names = [name for name in metadata_df.columns if name.startswith("virus volume")]
-    optogenetic_virus_volume_column_name = virus_volume_column_names[0]
-    optogenetic_virus_volume_in_nL = float(
-        row[optogenetic_virus_volume_column_name].replace("nL", "")
-    )  # 300nL --> 300.0
-    optogenetic_virus_volume_in_uL = optogenetic_virus_volume_in_nL / 1000.0
-    info_file_path = (
-        data_dir_path
-        / "Setup - Bing"
-        / "202408-old setting"
-        / "M008-240819-071001"
-        / "Lindsay_SBO_opto1-Evoke12_2in1-240817-154318"
-        / "M008-240819-071001"
-        / "Info.mat"
-    )
-    video_file_path = (
-        data_dir_path
-        / "Setup - Bing"
-        / "202408-old setting"
-        / "M008-240819-071001"
-        / "Lindsay_SBO_opto1-Evoke12_2in1-240817-154318"
-        / "M008-240819-071001"
-        / "Lindsay_SBO_opto1-Evoke12_2in1-240817-154318_M008-240819-071001_Cam1.avi"
-    )
-    tdt_fp_folder_path = (
-        data_dir_path
-        / "Setup - Bing"
-        / "202408-old setting"
-        / "M008-240819-071001"
-        / "Lindsay_SBO_opto1-Evoke12_2in1-240817-154318"
-        / "M008-240819-071001"
-    )
-    tdt_ephys_folder_path = (
-        data_dir_path
-        / "Setup - Bing"
-        / "202408-old setting"
-        / "M008-240819-071001"
-        / "Lindsay_SBO_opto1-Evoke12_2in1-240817-154318"
-    )
-    session_to_nwb(
-        info_file_path=info_file_path,
-        video_file_path=video_file_path,
-        tdt_ephys_folder_path=tdt_ephys_folder_path,
-        tdt_fp_folder_path=tdt_fp_folder_path,
-        stream_name="LFP1",
-        output_dir_path=output_dir_path,
-        subject_id=subject_id,
-        sex=sex,
-        dob=dob,
-        optogenetic_site_name=optogenetic_site_name,
-        record_fiber=record_fiber,
-        optogenetic_virus_volume_in_uL=optogenetic_virus_volume_in_uL,
-        stub_test=stub_test,
-        skip_fiber_photometry=True,
-        metadata_subfolder_name="opto-behavioral sum",
-    )
+    # The example sessions are independent, so they are converted in parallel processes
+    max_workers = max(1, min(len(session_to_nwb_kwargs_per_session), (os.cpu_count() or 2) // 2))
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        list(executor.map(_session_to_nwb_from_kwargs, session_to_nwb_kwargs_per_session))
 
-    # Setup - WS8
-    metadata_df = pd.read_csv(
-        data_dir_path / "metadata" / "opto-behavioral sum" / "behav_ChAT-cre_BF_2min-20Hz-stim - Sheet1.csv"
-    )
-    subject_id = "M337"
-    row = metadata_df[metadata_df["mouse ID"] == subject_id].iloc[0]
-    sex = "M" if row["M"] == 1 else "F"
-    pst = ZoneInfo("US/Pacific")
-    dob = datetime.datetime.strptime(row["DOB"], "%m/%d/%Y").replace(tzinfo=pst)
-    optogenetic_site_name = row["Stim region"]
-    record_fiber = 2
-    virus_volume_column_names = [name for name in metadata_df.columns if name.startswith("virus volume")]
-    optogenetic_virus_volume_column_name = virus_volume_column_names[0]
-    optogenetic_virus_volume_in_nL = float(
-        row[optogenetic_virus_volume_column_name].replace("nL", "")
-    )  # 300nL --> 300.0
-    optogenetic_virus_volume_in_uL = optogenetic_virus_volume_in_nL / 1000.0
-    info_file_path = (
-        data_dir_path
-        / "Setup - WS8"
-        / "WS8-202506"
-        / "M361_M337-250609-081001"
-        / "A_Lindsay_SBO_opto1_E_2miceRand-250609-081001"
-        / "M361_M337-250609-081001"
-        / "Info.mat"
-    )
-    video_file_path = (
-        data_dir_path
-        / "Setup - WS8"
-        / "WS8-202506"
-        / "M361_M337-250609-081001"
-        / "A_Lindsay_SBO_opto1_E_2miceRand-250609-081001"
-        / "M361_M337-250609-081001"
-        / "A_Lindsay_SBO_opto1_E_2miceRand-250609-081001_M361_M337-250609-081001_Cam2.avi"
-    )
-    tdt_fp_folder_path = (
-        data_dir_path
-        / "Setup - WS8"
-        / "WS8-202506"
-        / "M361_M337-250609-081001"
-        / "A_Lindsay_SBO_opto1_E_2miceRand-250609-081001"
-        / "M361_M337-250609-081001"
-    )
-    tdt_ephys_folder_path = (
-        data_dir_path
-        / "Setup - WS8"
-        / "WS8-202506"
-        / "M361_M337-250609-081001"
-        / "A_Lindsay_SBO_opto1_E_2miceRand-250609-081001"
-    )
-    session_to_nwb(
-        info_file_path=info_file_path,
-        video_file_path=video_file_path,
-        tdt_ephys_folder_path=tdt_ephys_folder_path,
-        tdt_fp_folder_path=tdt_fp_folder_path,
-        stream_name="LFP2",
-        output_dir_path=output_dir_path,
-        subject_id=subject_id,
-        sex=sex,
-        dob=dob,
-        optogenetic_site_name=optogenetic_site_name,
-        record_fiber=record_fiber,
-        optogenetic_virus_volume_in_uL=optogenetic_virus_volume_in_uL,
-        stub_test=stub_test,
-        skip_fiber_photometry=True,
-        metadata_subfolder_name="opto-behavioral sum",
-    )
 
-    # Setup - MollyFP
-    metadata_df = pd.read_csv(
-        data_dir_path / "metadata" / "opto-behavioral sum" / "behav_Sert-cre_DRN_2min-pTra-stim - Sheet1.csv"
-    )
-    subject_id = "M363"
-    row = metadata_df[metadata_df["mouse ID"] == subject_id].iloc[0]
-    sex = "M" if row["M"] == 1 else "F"
-    pst = ZoneInfo("US/Pacific")
-    dob = datetime.datetime.strptime(row["DOB"], "%m/%d/%Y").replace(tzinfo=pst)
-    optogenetic_site_name = row["Stim region"]
-    record_fiber = 1
-    virus_volume_column_names = [name for name in metadata_df.columns if name.startswith("virus volume")]
-    optogenetic_virus_volume_column_name = virus_volume_column_names[0]
-    optogenetic_virus_volume_in_nL = float(
-        row[optogenetic_virus_volume_column_name].replace("nL", "")
-    )  # 300nL --> 300.0
-    optogenetic_virus_volume_in_uL = optogenetic_virus_volume_in_nL / 1000.0
-    info_file_path = (
-        data_dir_path
-        / "Setup - MollyFP"
-        / "MollyFP-202507"
-        / "M363_M364-250722-191039"
-        / "A_Lindsay_TDTm_op1_pTra_2min-250722-190941"
-        / "M363_M364-250722-191039"
-        / "Info.mat"
-    )
-    video_file_path = (
-        data_dir_path
-        / "Setup - MollyFP"
-        / "MollyFP-202507"
-        / "M363_M364-250722-191039"
-        / "A_Lindsay_TDTm_op1_pTra_2min-250722-190941"
-        / "M363_M364-250722-191039"
-        / "A_Lindsay_TDTm_op1_pTra_2min-250722-190941_M363_M364-250722-191039_Cam1.avi"
-    )
-    tdt_fp_folder_path = (
-        data_dir_path
-        / "Setup - MollyFP"
-        / "MollyFP-202507"
-        / "M363_M364-250722-191039"
-        / "A_Lindsay_TDTm_op1_pTra_2min-250722-190941"
-        / "M363_M364-250722-191039"
-    )
-    tdt_ephys_folder_path = (
-        data_dir_path
-        / "Setup - MollyFP"
-        / "MollyFP-202507"
-        / "M363_M364-250722-191039"
-        / "A_Lindsay_TDTm_op1_pTra_2min-250722-190941"
-    )
-    session_to_nwb(
-        info_file_path=info_file_path,
-        video_file_path=video_file_path,
-        tdt_ephys_folder_path=tdt_ephys_folder_path,
-        tdt_fp_folder_path=tdt_fp_folder_path,
-        stream_name="LFP2",
-        output_dir_path=output_dir_path,
-        subject_id=subject_id,
-        sex=sex,
-        dob=dob,
-        optogenetic_site_name=optogenetic_site_name,
-        record_fiber=record_fiber,
-        optogenetic_virus_volume_in_uL=optogenetic_virus_volume_in_uL,
-        stub_test=stub_test,
-        skip_fiber_photometry=True,
-        shared_test_pulse=True,
-        metadata_subfolder_name="opto-behavioral sum",
-    )
+def _session_to_nwb_from_kwargs(session_to_nwb_kwargs: dict):
+    """Call session_to_nwb with a dictionary of kwargs, for use with ProcessPoolExecutor.map."""
+    session_to_nwb(**session_to_nwb_kwargs)
 
 
 if __name__ == "__main__":
@@ -1,19 +1,11 @@
 """Primary NWBConverter class for this dataset."""
-import os
-from contextlib import redirect_stdout
-from pathlib import Path
-
-import tdt
-
 from dan_lab_to_nwb.huang_2025_001617 import (
     Huang2025OptogeneticInterface,
     Huang2025TdtRecordingInterface,
 )
+from dan_lab_to_nwb.utils import Huang2025ExternalVideoInterface
 from neuroconv import NWBConverter
-from neuroconv.datainterfaces import (
-    ExternalVideoInterface,
-    TDTFiberPhotometryInterface,
-)
+from neuroconv.datainterfaces import TDTFiberPhotometryInterface
 
 
 class Huang2025NWBConverter(NWBConverter):
@@ -41,7 +33,7 @@ class Huang2025NWBConverter(NWBConverter):
         EEG=Huang2025TdtRecordingInterface,
         EMG=Huang2025TdtRecordingInterface,
         FiberPhotometry=TDTFiberPhotometryInterface,
-        Video=ExternalVideoInterface,
+        Video=Huang2025ExternalVideoInterface,
         Optogenetics=Huang2025OptogeneticInterface,
     )
 
@@ -51,6 +43,7 @@ class Huang2025NWBConverter(NWBConverter):
 
         This method reads the camera trigger events ('Cam1') from the TDT
         fiber photometry data and uses them to synchronize the video timestamps.
+        The TDT epocs are shared with the optogenetic interface so that they are only read once.
 
         Parameters
         ----------
@@ -63,8 +56,6 @@ class Huang2025NWBConverter(NWBConverter):
         -------
         None
         """
-        tdt_fp_folder_path = Path(self.data_interface_objects["Optogenetics"].source_data["folder_path"])
-        with open(os.devnull, "w") as f, redirect_stdout(f):
-            tdt_photometry = tdt.read_block(tdt_fp_folder_path, evtype=["epocs"])
-        video_timestamps = tdt_photometry.epocs["Cam1"].onset[:]
+        epocs = self.data_interface_objects["Optogenetics"].get_epocs()
+        video_timestamps = epocs["Cam1"].onset[:]
         self.data_interface_objects["Video"].set_aligned_timestamps([video_timestamps])
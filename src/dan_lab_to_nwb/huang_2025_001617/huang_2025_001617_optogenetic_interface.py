@@ -1,36 +1,118 @@
 """Primary class for converting optogenetic stimulation."""
-import copy
+import io
+import itertools
 import os
+import re
 from contextlib import redirect_stdout
+from functools import lru_cache
 from pathlib import Path
 
 import numpy as np
-import tdt
 from hdmf.common import DynamicTableRegion, VectorData, VectorIndex
-from ndx_ophys_devices import (
-    Effector,
-    ExcitationSource,
-    ExcitationSourceModel,
-    FiberInsertion,
-    OpticalFiber,
-    OpticalFiberModel,
-    ViralVector,
-    ViralVectorInjection,
-)
-from ndx_optogenetics import (
-    OptogeneticEffectors,
-    OptogeneticExperimentMetadata,
-    # OptogeneticEpochsTable,
-    OptogeneticPulsesTable,
-    OptogeneticSitesTable,
-    OptogeneticViruses,
-    OptogeneticVirusInjections,
-)
 from pydantic import DirectoryPath
 from pynwb.file import NWBFile
 
 from neuroconv.basedatainterface import BaseDataInterface
 
+# The TDT epoc of the intense stimulation of each session protocol, identified by a pattern of the session folder name
+# (None for the protocols without optogenetic stimulation).
+_FILE_PATTERN_TO_STIM_EPOC_NAME = {
+    "pTra_con": "Wi3_",
+    "opto1-Evoke12_2in1": "LasT",
+    "opto1_E_2": "LasT",
+    "opto1_E12_2in1": "LasT",
+    "opto_E_2": "LasT",
+    "TDTm_R_evoke": None,
+    "TDTm_op1_pTra": "Wi3_",
+    "TDTm_op1-E_pTra": "Wi3_",
+    "SBOX_R_evoke_2in1": None,
+    "TDTb_R_evoke_2in1": None,
+}
+# Only the patterns before the first protocol without stimulation are looked up (the table is scanned in order and the
+# scan stops there), so the other protocols, and unknown folder names, get no stimulation epoc.
+_STIM_FILE_PATTERNS = list(
+    itertools.takewhile(
+        lambda file_pattern: _FILE_PATTERN_TO_STIM_EPOC_NAME[file_pattern] is not None, _FILE_PATTERN_TO_STIM_EPOC_NAME
+    )
+)
+# Each pattern is a named group, so the name of the matched group identifies the pattern. None of these patterns
+# contains another, so a folder name (which holds a single protocol) matches at most one of them.
+_GROUP_NAME_TO_STIM_EPOC_NAME = {
+    f"pattern{index}": _FILE_PATTERN_TO_STIM_EPOC_NAME[file_pattern]
+    for index, file_pattern in enumerate(_STIM_FILE_PATTERNS)
+}
+_STIM_FILE_PATTERN_REGEX = re.compile(
+    "|".join(f"(?P<pattern{index}>{re.escape(file_pattern)})" for index, file_pattern in enumerate(_STIM_FILE_PATTERNS))
+)
+
+
+@lru_cache(maxsize=1)
+def _get_pulses_column_name_to_description() -> dict:
+    """
+    Get (and cache) the descriptions of the optogenetic pulses table columns.
+
+    ndx_optogenetics is only imported here and in the interface, so that importing this module stays cheap.
+
+    Returns
+    -------
+    dict
+        The description of each column of OptogeneticPulsesTable, plus the stimulus type column added by this
+        interface.
+    """
+    from ndx_optogenetics import OptogeneticPulsesTable
+
+    return {
+        **{column["name"]: column["description"] for column in OptogeneticPulsesTable.__columns__},
+        "stimulus_type": "Type of optogenetic stimulus (e.g., 'test_pulse', 'intense_stimulation')",
+    }
+
+
+def read_tdt_epocs(folder_path: DirectoryPath):
+    """
+    Read (and cache) the epocs of a TDT block.
+
+    The two subjects of a shared TDT block are converted from the same folder, so its epocs are only read once per
+    process (until a file of the folder is modified).
+
+    Parameters
+    ----------
+    folder_path : DirectoryPath
+        Path to the TDT folder.
+
+    Returns
+    -------
+    tdt.StructType
+        The epocs of the TDT block, keyed by epoc name (e.g. 'Cam1', 'St1_', 'Wi3_'). They must not be modified.
+    """
+    folder_path = str(folder_path)
+    with os.scandir(folder_path) as entries:
+        mtime = max((entry.stat().st_mtime for entry in entries if entry.is_file()), default=0.0)
+    return _read_tdt_epocs(folder_path=folder_path, mtime=mtime)
+
+
+@lru_cache(maxsize=4)
+def _read_tdt_epocs(folder_path: str, mtime: float):
+    """
+    Read the epocs of a TDT block (see read_tdt_epocs), keyed on its path and latest file modification time.
+
+    Parameters
+    ----------
+    folder_path : str
+        Path to the TDT folder.
+    mtime : float
+        Latest modification time of the files of the folder, so that edits invalidate the cache.
+
+    Returns
+    -------
+    tdt.StructType
+        The epocs of the TDT block.
+    """
+    import tdt
+
+    # tdt reports with print() rather than a logger, so its output is discarded into an in-memory buffer
+    with redirect_stdout(io.StringIO()):
+        return tdt.read_block(folder_path, evtype=["epocs"]).epocs
+
 
 class Huang2025OptogeneticInterface(BaseDataInterface):
     """
@@ -52,6 +134,12 @@ class Huang2025OptogeneticInterface(BaseDataInterface):
     """
 
     keywords = ["optogenetics"]
+    epoc_name_to_stimulus_type = {
+        "St1_": "test_pulse",
+        "St2_": "test_pulse",
+        "Wi3_": "intense_stimulation",
+        "LasT": "intense_stimulation",
+    }
 
     def __init__(
         self,
@@ -82,26 +170,12 @@ class Huang2025OptogeneticInterface(BaseDataInterface):
         super().__init__(
             folder_path=folder_path, optogenetic_site_name=optogenetic_site_name, virus_volume_in_uL=virus_volume_in_uL
         )
+        # The extensions are imported here so that they are in the global namespace when a pynwb.io object is created
+        import ndx_ophys_devices  # noqa: F401
+        import ndx_optogenetics  # noqa: F401
 
+        self._epocs = None  # read lazily and shared with the converter's temporal alignment
         folder_path = Path(folder_path)
-        file_pattern_to_stim_epoc_name = {
-            "pTra_con": "Wi3_",
-            "opto1-Evoke12_2in1": "LasT",
-            "opto1_E_2": "LasT",
-            "opto1_E12_2in1": "LasT",
-            "opto_E_2": "LasT",
-            "TDTm_R_evoke": None,
-            "TDTm_op1_pTra": "Wi3_",
-            "TDTm_op1-E_pTra": "Wi3_",
-            "SBOX_R_evoke_2in1": None,
-            "TDTb_R_evoke_2in1": None,
-        }
-        self.epoc_name_to_stimulus_type = {
-            "St1_": "test_pulse",
-            "St2_": "test_pulse",
-            "Wi3_": "intense_stimulation",
-            "LasT": "intense_stimulation",
-        }
         self.epoc_names = []
         if shared_test_pulse:
             self.epoc_names.append("St1_")
@@ -112,15 +186,22 @@ class Huang2025OptogeneticInterface(BaseDataInterface):
                 self.epoc_names.append("St2_")
             else:
                 raise ValueError(f"record_fiber must be 1 or 2, got {record_fiber}")
-        for file_pattern, epoc_name in file_pattern_to_stim_epoc_name.items():
-            if epoc_name is None:
-                return
-            if file_pattern in folder_path.parent.name:
-                self.epoc_names.append(epoc_name)
-                return
-        raise ValueError(
-            f"No matching file pattern found in {folder_path.parent}. Expected one of: {list(file_pattern_to_stim_epoc_name.keys())}"
-        )
+        match = _STIM_FILE_PATTERN_REGEX.search(folder_path.parent.name)
+        if match is not None:
+            self.epoc_names.append(_GROUP_NAME_TO_STIM_EPOC_NAME[match.lastgroup])
+
+    def get_epocs(self):
+        """
+        Get the TDT epocs of this session, reading them from the TDT folder on first access.
+
+        Returns
+        -------
+        tdt.StructType
+            The epocs of the TDT block, keyed by epoc name (e.g. 'Cam1', 'St1_', 'Wi3_').
+        """
+        if self._epocs is None:
+            self._epocs = read_tdt_epocs(folder_path=self.source_data["folder_path"])
+        return self._epocs
 
     def add_to_nwbfile(self, nwbfile: NWBFile, metadata: dict):
         """
@@ -147,21 +228,39 @@ class Huang2025OptogeneticInterface(BaseDataInterface):
         Stimulation pulses are sorted by start time and classified into types
         (test_pulse or intense_stimulation) based on the TDT epoch name.
         """
-        folder_path = Path(self.source_data["folder_path"])
+        from ndx_ophys_devices import (
+            Effector,
+            ExcitationSource,
+            ExcitationSourceModel,
+            FiberInsertion,
+            OpticalFiber,
+            OpticalFiberModel,
+            ViralVector,
+            ViralVectorInjection,
+        )
+        from ndx_optogenetics import (
+            OptogeneticEffectors,
+            OptogeneticExperimentMetadata,
+            OptogeneticPulsesTable,
+            OptogeneticSitesTable,
+            OptogeneticViruses,
+            OptogeneticVirusInjections,
+        )
+
         optogenetic_site_name = self.source_data["optogenetic_site_name"]
         virus_volume_in_uL = self.source_data["virus_volume_in_uL"]
-        with open(os.devnull, "w") as f, redirect_stdout(f):
-            tdt_photometry = tdt.read_block(folder_path, evtype=["epocs"])
+        epocs = self.get_epocs()
 
-        opto_metadata = copy.deepcopy(metadata["Optogenetics"])
+        # The metadata is only read; each entry that is modified below is shallow-copied first
+        opto_metadata = metadata["Optogenetics"]
         for excitation_source_model_metadata in opto_metadata["ExcitationSourceModels"]:
             excitation_source_model = ExcitationSourceModel(**excitation_source_model_metadata)
             nwbfile.add_device_model(excitation_source_model)
         for excitation_source_metadata in opto_metadata["ExcitationSources"]:
+            excitation_source_metadata = dict(excitation_source_metadata)
             model_name = excitation_source_metadata["model"]
-            if model_name in nwbfile.device_models:
-                excitation_source_metadata["model"] = nwbfile.device_models[model_name]
-            else:
+            excitation_source_metadata["model"] = nwbfile.device_models.get(model_name)
+            if excitation_source_metadata["model"] is None:
                 raise ValueError(
                     f"Excitation source model '{model_name}' not found in NWBFile devices. "
                     "Ensure that ExcitationSourceModels has a model with this name."
@@ -174,10 +273,10 @@ class Huang2025OptogeneticInterface(BaseDataInterface):
         for optical_fiber_metadata in opto_metadata["OpticalFibers"]:
             if not optogenetic_site_name in optical_fiber_metadata["name"]:
                 continue
+            optical_fiber_metadata = dict(optical_fiber_metadata)
             model_name = optical_fiber_metadata["model"]
-            if model_name in nwbfile.device_models:
-                optical_fiber_metadata["model"] = nwbfile.device_models[model_name]
-            else:
+            optical_fiber_metadata["model"] = nwbfile.device_models.get(model_name)
+            if optical_fiber_metadata["model"] is None:
                 raise ValueError(
                     f"Optical fiber model '{model_name}' not found in NWBFile devices. "
                     "Ensure that OpticalFiberModels has a model with this name."
@@ -201,12 +300,13 @@ class Huang2025OptogeneticInterface(BaseDataInterface):
         for virus_injection_metadata in opto_metadata["OptogeneticVirusInjections"]:
             if not optogenetic_site_name in virus_injection_metadata["name"]:
                 continue
+            virus_injection_metadata = dict(virus_injection_metadata)
             virus_injection_metadata["volume_in_uL"] = virus_volume_in_uL
-            if virus_injection_metadata["viral_vector"] in name_to_virus:
-                virus_injection_metadata["viral_vector"] = name_to_virus[virus_injection_metadata["viral_vector"]]
-            else:
+            virus_name = virus_injection_metadata["viral_vector"]
+            virus_injection_metadata["viral_vector"] = name_to_virus.get(virus_name)
+            if virus_injection_metadata["viral_vector"] is None:
                 raise ValueError(
-                    f"Virus '{virus_injection_metadata['viral_vector']}' not found in NWBFile viruses. "
+                    f"Virus '{virus_name}' not found in NWBFile viruses. "
                     "Ensure that OptogeneticViruses has a virus with this name."
                 )
             virus_injection = ViralVectorInjection(**virus_injection_metadata)
@@ -222,16 +322,14 @@ class Huang2025OptogeneticInterface(BaseDataInterface):
         for effector_metadata in opto_metadata["OptogeneticEffectors"]:
             if not optogenetic_site_name in effector_metadata["name"]:
                 continue
-            if effector_metadata["viral_vector_injection"] in name_to_virus_injection:
-                if effector_metadata["viral_vector_injection"] in name_to_virus_injection:
-                    effector_metadata["viral_vector_injection"] = name_to_virus_injection[
-                        effector_metadata["viral_vector_injection"]
-                    ]
-                else:
-                    raise ValueError(
-                        f"Viral vector injection '{effector_metadata['viral_vector_injection']}' not found in NWBFile virus injections. "
-                        "Ensure that OptogeneticVirusInjections has an injection with this name."
-                    )
+            effector_metadata = dict(effector_metadata)
+            virus_injection_name = effector_metadata["viral_vector_injection"]
+            effector_metadata["viral_vector_injection"] = name_to_virus_injection.get(virus_injection_name)
+            if effector_metadata["viral_vector_injection"] is None:
+                raise ValueError(
+                    f"Viral vector injection '{virus_injection_name}' not found in NWBFile virus injections. "
+                    "Ensure that OptogeneticVirusInjections has an injection with this name."
+                )
             effector = Effector(**effector_metadata)
             name_to_effector[effector.name] = effector
         if len(name_to_effector) > 0:
@@ -244,31 +342,25 @@ class Huang2025OptogeneticInterface(BaseDataInterface):
         optogenetic_sites_table = OptogeneticSitesTable(
             description=opto_metadata["OptogeneticSitesTable"]["description"]
         )
+        # Resolve the devices of all rows first, so that every missing device name is reported at once
+        name_to_device = dict(nwbfile.devices)
+        missing_device_names = []
+        site_rows = []
         for row_metadata in opto_metadata["OptogeneticSitesTable"]["rows"]:
             if not optogenetic_site_name in row_metadata["name"]:
                 continue
+            row_metadata = dict(row_metadata)
             row_metadata.pop("name")  # dict_deep_update requires a 'name' key, but we don't need it in the NWBFile
-            excitation_source_name = row_metadata["excitation_source"]
-            if excitation_source_name in nwbfile.devices:
-                excitation_source = nwbfile.devices[excitation_source_name]
-            else:
-                raise ValueError(
-                    f"Excitation source '{excitation_source_name}' not found in NWBFile devices. "
-                    "Ensure that ExcitationSources has a source with this name."
-                )
-            optical_fiber_name = row_metadata["optical_fiber"]
-            if optical_fiber_name in nwbfile.devices:
-                optical_fiber = nwbfile.devices[optical_fiber_name]
-            else:
-                raise ValueError(
-                    f"Optical fiber '{optical_fiber_name}' not found in NWBFile devices. "
-                    "Ensure that OpticalFibers has a fiber with this name."
-                )
+            excitation_source = name_to_device.get(row_metadata["excitation_source"])
+            if excitation_source is None:
+                missing_device_names.append(f"excitation source '{row_metadata['excitation_source']}'")
+            optical_fiber = name_to_device.get(row_metadata["optical_fiber"])
+            if optical_fiber is None:
+                missing_device_names.append(f"optical fiber '{row_metadata['optical_fiber']}'")
             if "effector" in row_metadata:
                 effector_name = row_metadata["effector"]
-                if effector_name in name_to_effector:
-                    effector = name_to_effector[effector_name]
-                else:
+                effector = name_to_effector.get(effector_name)
+                if effector is None:
                     raise ValueError(
                         f"Effector '{effector_name}' not found in NWBFile effectors. "
                         "Ensure that OptogeneticEffectors has an effector with this name."
@@ -278,11 +370,14 @@ class Huang2025OptogeneticInterface(BaseDataInterface):
                     "Effector is required in OptogeneticSitesTable rows. "
                     "Ensure that OptogeneticEffectors has an effector for each site."
                 )
-            optogenetic_sites_table.add_row(
-                excitation_source=excitation_source,
-                optical_fiber=optical_fiber,
-                effector=effector,
+            site_rows.append(dict(excitation_source=excitation_source, optical_fiber=optical_fiber, effector=effector))
+        if missing_device_names:
+            raise ValueError(
+                f"Devices not found in NWBFile devices: {', '.join(missing_device_names)}. "
+                "Ensure that ExcitationSources and OpticalFibers have devices with these names."
             )
+        for site_row in site_rows:
+            optogenetic_sites_table.add_row(**site_row)
 
         optogenetic_experiment_metadata = OptogeneticExperimentMetadata(
             optogenetic_sites_table=optogenetic_sites_table,
@@ -296,50 +391,39 @@ class Huang2025OptogeneticInterface(BaseDataInterface):
         power_in_mW = opto_metadata["ExcitationSources"][0]["power_in_W"] * 1000  # Convert from Watts to mW
         wavelength_in_nm = opto_metadata["excitation_wavelength_in_nm"]
 
-        column_name_to_data = {}
-        column_name_to_description = {}
-        colnames = [
-            "start_time",
-            "stop_time",
-            "power_in_mW",
-            "wavelength_in_nm",
-        ]
-        for col in OptogeneticPulsesTable.__columns__:
-            if col["name"] not in colnames:
-                continue
-            column_name_to_data[col["name"]] = []
-            column_name_to_description[col["name"]] = col["description"]
-        colnames.append("stimulus_type")
-        column_name_to_data["stimulus_type"] = []
-        column_name_to_description[
-            "stimulus_type"
-        ] = "Type of optogenetic stimulus (e.g., 'test_pulse', 'intense_stimulation')"
-
-        optogenetic_sites_data = []
-        for epoc_name in self.epoc_names:
-            stimulus_type = self.epoc_name_to_stimulus_type[epoc_name]
-            onset_times = tdt_photometry.epocs[epoc_name].onset
-            offset_times = tdt_photometry.epocs[epoc_name].offset
-            row = 0
-
-            for onset_time, offset_time in zip(onset_times, offset_times, strict=True):
-                column_name_to_data["start_time"].append(onset_time)
-                column_name_to_data["stop_time"].append(offset_time)
-                column_name_to_data["power_in_mW"].append(power_in_mW)
-                column_name_to_data["wavelength_in_nm"].append(wavelength_in_nm)
-                column_name_to_data["stimulus_type"].append(stimulus_type)
-
-                optogenetic_sites_data.append(row)
+        # The pulses of each epoc are copied as whole arrays into columns preallocated for all the pulses
+        num_pulses = sum(len(epocs[epoc_name].onset) for epoc_name in self.epoc_names)
+        start_times = np.empty(num_pulses, dtype=float)
+        stop_times = np.empty(num_pulses, dtype=float)
+        epoc_indices = np.empty(num_pulses, dtype=np.intp)
+        start = 0
+        for epoc_index, epoc_name in enumerate(self.epoc_names):
+            onset_times, offset_times = epocs[epoc_name].onset, epocs[epoc_name].offset
+            if len(onset_times) != len(offset_times):
+                raise ValueError(f"Epoc '{epoc_name}' has {len(onset_times)} onsets but {len(offset_times)} offsets.")
+            stop = start + len(onset_times)
+            start_times[start:stop] = onset_times
+            stop_times[start:stop] = offset_times
+            epoc_indices[start:stop] = epoc_index
+            start = stop
+        stimulus_types = np.array([self.epoc_name_to_stimulus_type[name] for name in self.epoc_names], dtype=object)
 
         # Sort by start time
-        sort_indices = np.argsort(column_name_to_data["start_time"])
-        for key in column_name_to_data:
-            column_name_to_data[key] = [column_name_to_data[key][i] for i in sort_indices]
-        optogenetic_sites_data = [optogenetic_sites_data[i] for i in sort_indices]
+        sort_indices = np.argsort(start_times)
+        column_name_to_data = dict(
+            start_time=start_times[sort_indices],
+            stop_time=stop_times[sort_indices],
+            power_in_mW=np.full(num_pulses, power_in_mW, dtype=float),
+            wavelength_in_nm=np.full(num_pulses, wavelength_in_nm, dtype=float),
+            stimulus_type=stimulus_types[epoc_indices[sort_indices]].tolist(),
+        )
+        optogenetic_sites_data = np.zeros(num_pulses, dtype=int)  # every pulse is at the single site of the table
 
+        column_name_to_description = _get_pulses_column_name_to_description()
+        colnames = list(column_name_to_data)
         columns = [
-            VectorData(name=colname, description=column_name_to_description[colname], data=column_name_to_data[colname])
-            for colname in colnames
+            VectorData(name=colname, description=column_name_to_description[colname], data=data)
+            for colname, data in column_name_to_data.items()
         ]
         optogenetic_sites = DynamicTableRegion(
             name="optogenetic_sites",
@@ -1,4 +1,6 @@
 """Primary class for converting TDT Ephys Recordings."""
+from itertools import chain
+
 import numpy as np
 from pynwb.ecephys import ElectricalSeries
 from pynwb.file import NWBFile
@@ -74,17 +76,22 @@ class Huang2025TdtRecordingInterface(TdtRecordingInterface):
 
         electrode_group_name_to_num_channels = {"ElectrodeGroupEEG": 2, "ElectrodeGroupEMG": 2}
         channel_ids = self.recording_extractor.get_channel_ids()
-        locations, names = [], []
-        for electrode_group_meta in metadata["Ecephys"]["ElectrodeGroup"]:
-            name = electrode_group_meta["name"]
-            num_channels = electrode_group_name_to_num_channels[name]
-            location = electrode_group_meta["location"]
-            locations.extend([location] * num_channels)
-            names.extend([name] * num_channels)
+        electrode_groups_metadata = metadata["Ecephys"]["ElectrodeGroup"]
+        locations = list(
+            chain.from_iterable(
+                [group_meta["location"]] * electrode_group_name_to_num_channels[group_meta["name"]]
+                for group_meta in electrode_groups_metadata
+            )
+        )
+        names = list(
+            chain.from_iterable(
+                [group_meta["name"]] * electrode_group_name_to_num_channels[group_meta["name"]]
+                for group_meta in electrode_groups_metadata
+            )
+        )
         channel_names = ["EEG1", "EEG2", "EMG1", "EMG2"]
-        self.recording_extractor.set_property(key="brain_area", ids=channel_ids, values=locations)
-        self.recording_extractor.set_property(key="group_name", ids=channel_ids, values=names)
-        self.recording_extractor.set_property(key="channel_name", ids=channel_ids, values=channel_names)
+        for key, values in (("brain_area", locations), ("group_name", names), ("channel_name", channel_names)):
+            self.recording_extractor.set_property(key=key, ids=channel_ids, values=values)
 
         add_recording_metadata_to_nwbfile(
             recording=self.recording_extractor,
@@ -192,7 +199,7 @@ def add_electrical_series_to_nwbfile(
     eseries_kwargs.update(electrodes=electrode_table_region)
 
     # Iterator
-    iterator_opts = iterator_opts if iterator_opts is not None else {}
+    iterator_opts = dict(iterator_opts) if iterator_opts is not None else {}  # the options may be shared
     iterator_opts["return_scaled"] = write_scaled
     ephys_data_iterator = Huang2025RecordingDataChunkIterator(
         recording=recording,
@@ -381,9 +388,6 @@ from typing import Iterable, Optional
 from tqdm import tqdm
 
 from neuroconv.tools.hdmf import GenericDataChunkIterator
-from neuroconv.tools.spikeinterface.spikeinterfacerecordingdatachunkiterator import (
-    get_electrical_series_chunk_shape,
-)
 
 
 class Huang2025RecordingDataChunkIterator(GenericDataChunkIterator):
@@ -468,17 +472,30 @@ class Huang2025RecordingDataChunkIterator(GenericDataChunkIterator):
         )
 
     def _get_default_chunk_shape(self, chunk_mb: float = 10.0) -> tuple[int, int]:
+        """
+        Get a chunk shape that spans all selected channels and tiles the recording along time.
+
+        The EEG and EMG series are always read across all of their channels together, so splitting the channel axis
+        would only force TDT to sub-select channels for every chunk.
+
+        Parameters
+        ----------
+        chunk_mb : float, default: 10.0
+            The upper bound on size in megabytes (MB) of each chunk.
+
+        Returns
+        -------
+        tuple[int, int]
+            The chunk shape as (number of frames, number of channels).
+        """
         assert chunk_mb > 0, f"chunk_mb ({chunk_mb}) must be greater than zero!"
 
         number_of_channels = len(self.channel_ids)
-        number_of_frames = self.recording.get_num_frames(segment_index=self.segment_index)
-        dtype = self.recording.get_dtype()
-
-        chunk_shape = get_electrical_series_chunk_shape(
-            number_of_channels=number_of_channels, number_of_frames=number_of_frames, dtype=dtype, chunk_mb=chunk_mb
-        )
+        number_of_frames = self.recording.get_num_samples(segment_index=self.segment_index)
+        itemsize = np.dtype(self.recording.get_dtype()).itemsize
+        frames_per_chunk = max(1, int(chunk_mb * 1e6) // (number_of_channels * itemsize))
 
-        return chunk_shape
+        return (min(frames_per_chunk, number_of_frames), number_of_channels)
 
     def _get_data(self, selection: tuple[slice]) -> Iterable:
         return self.recording.get_traces(
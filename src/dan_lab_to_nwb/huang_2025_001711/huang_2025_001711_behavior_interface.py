@@ -1,13 +1,16 @@
 """Primary class for converting behavior."""
+from functools import lru_cache
 from pathlib import Path
 
 import numpy as np
 import pandas as pd
+from hdmf.common import VectorData, VectorIndex
 from pydantic import DirectoryPath, FilePath
-from pymatreader import read_mat
 from pynwb.core import DynamicTable
+from pynwb.epoch import TimeIntervals
 from pynwb.file import NWBFile
 
+from dan_lab_to_nwb.utils import read_csv_with_parquet_cache, read_mat_variable
 from neuroconv.basedatainterface import BaseDataInterface
 from neuroconv.tools.nwb_helpers import get_module
 from neuroconv.utils import get_base_schema
@@ -113,26 +116,49 @@ class Huang2025BehaviorInterface(BaseDataInterface):
 
         Notes
         -----
-        Behavioral labels are converted to 5-second epochs and added to the NWB
-        file's epochs table. The behavioral summary table is added to a processing
-        module named 'behavior'.
+        Behavioral labels are given in 5-second epochs. Runs of consecutive identical
+        labels are merged into a single epoch and added to the NWB file's epochs table.
+        The behavioral summary table is added to a processing module named 'behavior'.
         """
         # Load label data
         labels_file_path = Path(self.source_data["labels_file_path"])
-        label_ids = read_mat(filename=labels_file_path)["labels"]
-        start_times = np.arange(len(label_ids)) * 5.0
-        stop_times = np.concatenate((start_times[1:], [start_times[-1] + 5.0]))
+        label_ids = _read_labels(file_path=labels_file_path).astype(np.int64)
 
-        # Add epochs for each behavior label
-        for label_id, start_time, stop_time in zip(label_ids, start_times, stop_times, strict=True):
-            label_name = self.label_id_to_name[label_id]
-            nwbfile.add_epoch(start_time=start_time, stop_time=stop_time, tags=[label_name])
+        # Merge runs of consecutive identical labels into bouts
+        bout_start_indices, bout_stop_indices, bout_label_ids = _run_length_encode(label_ids=label_ids)
+        start_times = bout_start_indices * 5.0
+        stop_times = bout_stop_indices * 5.0
+
+        # Add epochs for each behavior bout
+        label_names = [self.label_id_to_name[label_id] for label_id in bout_label_ids]
+        if nwbfile.epochs is None:
+            # Build the epochs table in one shot instead of validating every row with add_epoch
+            tags = VectorData(name="tags", description="user-defined tags", data=label_names)
+            tags_index = VectorIndex(name="tags_index", target=tags, data=np.arange(1, len(label_names) + 1))
+            nwbfile.epochs = TimeIntervals(
+                name="epochs",
+                description="experimental epochs",
+                columns=[
+                    VectorData(name="start_time", description="Start time of epoch, in seconds", data=start_times),
+                    VectorData(name="stop_time", description="Stop time of epoch, in seconds", data=stop_times),
+                    tags,
+                    tags_index,
+                ],
+            )
+        else:
+            for label_name, start_time, stop_time in zip(label_names, start_times, stop_times, strict=True):
+                nwbfile.add_epoch(start_time=start_time, stop_time=stop_time, tags=[label_name])
 
         # Load behavioral summary data
         behavioral_summary_file_path = Path(self.source_data["behavioral_summary_file_path"])
-        behavioral_summary_df = pd.read_csv(behavioral_summary_file_path)
+        behavioral_summary_df = _read_behavioral_summary(
+            file_path=str(behavioral_summary_file_path), mtime=behavioral_summary_file_path.stat().st_mtime
+        )
         session_name = labels_file_path.parent.parent.name.split("-")[-1]  # ex. M407-S1 --> S1
-        session_summary_df = behavioral_summary_df[behavioral_summary_df["session"] == session_name]
+        if session_name in behavioral_summary_df.index:
+            session_summary_df = behavioral_summary_df.loc[[session_name]]
+        else:
+            session_summary_df = behavioral_summary_df.iloc[:0]
         assert (
             len(session_summary_df) == 1
         ), f"Expected one summary row for session {session_name}, found {len(session_summary_df)}"
@@ -143,15 +169,89 @@ class Huang2025BehaviorInterface(BaseDataInterface):
         table_description = table_metadata["description"]
         columns_metadata = table_metadata["columns"]
 
-        # Add BehavioralSummaryTable
-        behavioral_summary_table = DynamicTable(name=table_name, description=table_description)
-        row_data = {}
-        for column_meta in columns_metadata:
-            behavioral_summary_table.add_column(
+        # Add BehavioralSummaryTable, built in one shot from the single session row
+        session_summary = session_summary_df.iloc[0]
+        columns = [
+            VectorData(
                 name=column_meta["name"],
                 description=column_meta["description"],
+                data=[session_summary[column_meta["name"]]],
             )
-            row_data[column_meta["name"]] = session_summary_df[column_meta["name"]].values[0]
-        behavioral_summary_table.add_row(**row_data)
+            for column_meta in columns_metadata
+        ]
+        behavioral_summary_table = DynamicTable(name=table_name, description=table_description, columns=columns)
         behavior_module = get_module(nwbfile=nwbfile, name="behavior")
         behavior_module.add(behavioral_summary_table)
+
+
+@lru_cache(maxsize=32)
+def _read_behavioral_summary(file_path: str, mtime: float) -> pd.DataFrame:
+    """
+    Read (and cache) a subject-level behavioral summary .csv file, indexed by session.
+
+    The same summary file is shared by all sessions of a subject.
+
+    Parameters
+    ----------
+    file_path : str
+        Path to the behavioral summary .csv file.
+    mtime : float
+        Modification time of the file, so that edits invalidate the cache.
+
+    Returns
+    -------
+    pd.DataFrame
+        The behavioral summary indexed by the 'session' column. It must not be modified.
+    """
+    return read_csv_with_parquet_cache(file_path).set_index("session", drop=False)
+
+
+def _read_labels(file_path: FilePath) -> np.ndarray:
+    """
+    Read only the 'labels' variable from a .mat file.
+
+    Parameters
+    ----------
+    file_path : FilePath
+        Path to the .mat file containing the behavioral state labels.
+
+    Returns
+    -------
+    np.ndarray
+        1D array of behavioral state label IDs.
+    """
+    return read_mat_variable(file_path=file_path, variable_name="labels").ravel()
+
+
+def _run_length_encode(label_ids: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Run-length encode a label vector into runs of consecutive identical labels.
+
+    Parameters
+    ----------
+    label_ids : np.ndarray
+        1D array of label IDs.
+
+    Returns
+    -------
+    start_indices : np.ndarray
+        Index of the first label of each run.
+    stop_indices : np.ndarray
+        Index one past the last label of each run, so that run i spans label_ids[start_indices[i]:stop_indices[i]].
+    run_label_ids : np.ndarray
+        Label ID of each run.
+
+    Notes
+    -----
+    The duration of each bout is (stop_indices - start_indices) times the 5 s scoring epoch, and the total time
+    in a stage is the sum of those durations over the runs of its label. They are not computed or stored here, since
+    the epochs table already holds the start and stop time of every bout, from which they follow directly.
+    The encoding is vectorized with numpy rather than compiled with numba: np.diff and np.flatnonzero already run
+    at C speed over the label vector, so a numba kernel would only add a dependency and a JIT warm-up.
+    """
+    if len(label_ids) == 0:
+        empty = np.array([], dtype=np.int64)
+        return empty, empty, label_ids[:0]
+    stop_indices = np.r_[np.flatnonzero(np.diff(label_ids)) + 1, len(label_ids)]
+    start_indices = np.r_[0, stop_indices[:-1]]
+    return start_indices, stop_indices, label_ids[start_indices]
@@ -1,18 +1,19 @@
 """Primary script to run to convert all sessions in a dataset using session_to_nwb."""
-import shutil
+import os
 import traceback
-from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 from pprint import pformat
 from typing import Union
 
 from pydantic import DirectoryPath
-from pymatreader import read_mat
 from tqdm import tqdm
 
 from dan_lab_to_nwb.huang_2025_001711.huang_2025_001711_convert_session import (
+    read_info,
     session_to_nwb,
 )
+from dan_lab_to_nwb.utils import init_conversion_worker
 
 
 def dataset_to_nwb(
@@ -21,6 +22,7 @@ def dataset_to_nwb(
     output_dir_path: DirectoryPath,
     max_workers: int = 1,
     verbose: bool = True,
+    overwrite: bool = False,
 ):
     """Convert the entire dataset to NWB.
 
@@ -34,48 +36,67 @@ def dataset_to_nwb(
         The number of workers to use for parallel processing, by default 1
     verbose : bool, optional
         Whether to print verbose output, by default True
+    overwrite : bool, optional
+        Whether to convert again the sessions whose NWB file already exists in output_dir_path, by default False.
+        A failed conversion leaves no NWB file, so the sessions that failed in a previous run are converted again.
     """
     data_dir_path = Path(data_dir_path)
+    output_dir_path = Path(output_dir_path)
+    output_dir_path.mkdir(parents=True, exist_ok=True)  # once, rather than in every session_to_nwb call
     session_to_nwb_kwargs_per_session = get_session_to_nwb_kwargs_per_session(
         data_dir_path=data_dir_path,
     )
 
-    futures = []
-    with ProcessPoolExecutor(max_workers=max_workers) as executor:
-        for session_to_nwb_kwargs in session_to_nwb_kwargs_per_session:
-            session_to_nwb_kwargs["output_dir_path"] = output_dir_path
-            session_to_nwb_kwargs["verbose"] = verbose
-            nwbfile_name = get_nwbfile_name(session_to_nwb_kwargs=session_to_nwb_kwargs)
-            nwbfile_stem = Path(nwbfile_name).stem
-            exception_file_path = output_dir_path / f"ERROR_{nwbfile_stem}.txt"
-            futures.append(
-                executor.submit(
-                    safe_session_to_nwb,
-                    session_to_nwb_kwargs=session_to_nwb_kwargs,
-                    exception_file_path=exception_file_path,
-                )
-            )
-        for _ in tqdm(as_completed(futures), total=len(futures)):
+    # The Info.mat of each session is only read in the worker that converts it, which skips the converted sessions
+    for session_to_nwb_kwargs in session_to_nwb_kwargs_per_session:
+        session_to_nwb_kwargs["output_dir_path"] = output_dir_path
+        session_to_nwb_kwargs["verbose"] = verbose
+        session_to_nwb_kwargs["overwrite"] = overwrite
+
+    num_sessions = len(session_to_nwb_kwargs_per_session)
+    max_workers = max(1, min(max_workers, num_sessions))  # do not spawn idle workers
+    chunksize = max(1, num_sessions // (4 * max_workers))
+    with ProcessPoolExecutor(
+        max_workers=max_workers,
+        initializer=init_conversion_worker,
+        initargs=("dan_lab_to_nwb.huang_2025_001711.huang_2025_001711_convert_session",),
+    ) as executor:
+        results = executor.map(_safe_session_to_nwb_from_kwargs, session_to_nwb_kwargs_per_session, chunksize=chunksize)
+        for _ in tqdm(results, total=num_sessions, mininterval=1.0, smoothing=0):
             pass
 
 
-def safe_session_to_nwb(*, session_to_nwb_kwargs: dict, exception_file_path: Union[Path, str]):
+def _safe_session_to_nwb_from_kwargs(session_to_nwb_kwargs: dict):
+    """Call safe_session_to_nwb with a dictionary of kwargs, for use with ProcessPoolExecutor.map."""
+    safe_session_to_nwb(session_to_nwb_kwargs=session_to_nwb_kwargs)
+
+
+def safe_session_to_nwb(*, session_to_nwb_kwargs: dict, exception_file_path: Union[Path, str, None] = None):
     """Convert a session to NWB while handling any errors by recording error messages to the exception_file_path.
 
+    The error file of a previous run is removed once the session converts successfully.
+
     Parameters
     ----------
     session_to_nwb_kwargs : dict
         The arguments for session_to_nwb.
-    exception_file_path : Path
-        The path to the file where the exception messages will be saved.
+    exception_file_path : Path, optional
+        The path to the file where the exception messages will be saved. By default, the file named by
+        get_exception_file_name in the output_dir_path of the session.
     """
+    if exception_file_path is None:
+        exception_file_name = get_exception_file_name(session_to_nwb_kwargs=session_to_nwb_kwargs)
+        exception_file_path = Path(session_to_nwb_kwargs["output_dir_path"]) / exception_file_name
     exception_file_path = Path(exception_file_path)
     try:
         session_to_nwb(**session_to_nwb_kwargs)
     except Exception as e:
-        with open(exception_file_path, mode="w") as f:
-            f.write(f"session_to_nwb_kwargs: \n {pformat(session_to_nwb_kwargs)}\n\n")
-            f.write(traceback.format_exc())
+        # Write the whole message at once, so that each error file costs a single write
+        exception_file_path.write_text(
+            f"session_to_nwb_kwargs: \n {pformat(session_to_nwb_kwargs)}\n\n{traceback.format_exc()}"
+        )
+    else:
+        exception_file_path.unlink(missing_ok=True)  # the error file of a previous run no longer applies
 
 
 def get_nwbfile_name(*, session_to_nwb_kwargs: dict) -> str:
@@ -92,13 +113,39 @@ def get_nwbfile_name(*, session_to_nwb_kwargs: dict) -> str:
         The NWB file name.
     """
     info_file_path = session_to_nwb_kwargs["info_file_path"]
-    info = read_mat(filename=info_file_path)["Info"]
+    info = read_info(info_file_path=str(info_file_path))
     session_id = info["blockname"]
     subject_id = info["Subject"]
     nwbfile_name = f"sub-{subject_id}_ses-{session_id}.nwb"
     return nwbfile_name
 
 
+def get_exception_file_name(*, session_to_nwb_kwargs: dict) -> str:
+    """Get the name of the file where the errors of a session are recorded, ERROR_{NWB file stem}.txt.
+
+    The NWB file name is read from Info.mat, which session_to_nwb reads (and caches) in the same worker.
+    If Info.mat cannot be read, the session folder name is used instead (ex. 'ERROR_M407-S1.txt').
+
+    Parameters
+    ----------
+    session_to_nwb_kwargs : dict
+        The kwargs for session_to_nwb, which should contain the path to the info file.
+
+    Returns
+    -------
+    str
+        The exception file name, ex. 'ERROR_sub-M407_ses-M405_M407-250412-081001.txt'.
+    """
+    try:
+        nwbfile_name = get_nwbfile_name(session_to_nwb_kwargs=session_to_nwb_kwargs)
+    except Exception:  # session_to_nwb fails on the same Info.mat, and its error is recorded under the folder name
+        info_file_path = Path(session_to_nwb_kwargs["info_file_path"])
+        session_folder_name = info_file_path.parent.parent.name  # ex. M407/M407-S1/check_FP/Info.mat --> M407-S1
+        return f"ERROR_{session_folder_name}.txt"
+    nwbfile_stem = Path(nwbfile_name).stem
+    return f"ERROR_{nwbfile_stem}.txt"
+
+
 def get_session_to_nwb_kwargs_per_session(
     *,
     data_dir_path: DirectoryPath,
@@ -118,17 +165,27 @@ def get_session_to_nwb_kwargs_per_session(
 
     data_dir_path = Path(data_dir_path)
     session_to_nwb_kwargs_per_session = []
-    for subject_folder in data_dir_path.iterdir():
-        if not subject_folder.is_dir():
-            continue
+    # DirEntry.is_dir reuses the file type from the directory listing, so only symlinks cost an extra stat
+    with os.scandir(data_dir_path) as subject_entries:
+        subject_folders = [Path(entry.path) for entry in subject_entries if entry.is_dir()]
+    for subject_folder in subject_folders:
         behavioral_summary_file_path = subject_folder / f"{subject_folder.name}_beh_summary.csv"
-        for session_folder in subject_folder.iterdir():
-            if not session_folder.is_dir():
-                continue
+        with os.scandir(subject_folder) as session_entries:
+            session_folders = [Path(entry.path) for entry in session_entries if entry.is_dir()]
+        for session_folder in session_folders:
+            # Classify the session folder entries in a single directory scan
+            video_file_path, dlc_file_path = None, None
+            with os.scandir(session_folder) as entries:
+                for entry in entries:
+                    if video_file_path is None and entry.name.endswith(".avi"):
+                        video_file_path = Path(entry.path)
+                    elif dlc_file_path is None and "DLC" in entry.name and entry.name.endswith(".h5"):
+                        dlc_file_path = Path(entry.path)
+            if video_file_path is None or dlc_file_path is None:
+                raise ValueError(f"Expected a .avi video and a DLC .h5 file in {session_folder}.")
+
             check_FP_folder = session_folder / "check_FP"
             info_file_path = check_FP_folder / "Info.mat"
-            video_file_path = next(session_folder.glob("*.avi"))
-            dlc_file_path = next(session_folder.glob("*DLC*.h5"))
             labels_file_path = check_FP_folder / "labels.mat"
             eeg_file_path = check_FP_folder / "EEG.mat"
             emg_file_path = check_FP_folder / "EMG.mat"
@@ -155,13 +212,12 @@ if __name__ == "__main__":
     output_dir_path = Path("/Volumes/T7/CatalystNeuro/Dan/conversion_nwb/huang_2025_001711")
     max_workers = 5
     verbose = False
-
-    if output_dir_path.exists():
-        shutil.rmtree(output_dir_path)
+    overwrite = False
 
     dataset_to_nwb(
         data_dir_path=data_dir_path,
         output_dir_path=output_dir_path,
         max_workers=max_workers,
         verbose=verbose,
+        overwrite=overwrite,
     )
@@ -1,16 +1,84 @@
 """Primary script to run to convert an entire session for of data using the NWBConverter."""
-import datetime
-import shutil
+import os
+from copy import deepcopy
+from functools import lru_cache
 from pathlib import Path
-from zoneinfo import ZoneInfo
+from typing import Literal
 
 from pydantic import DirectoryPath, FilePath
-from pymatreader import read_mat
 
 from dan_lab_to_nwb.huang_2025_001711 import Huang2025NWBConverter
+from dan_lab_to_nwb.utils import (
+    PST,
+    configure_electrical_series_datasets,
+    parse_tdt_start_time,
+    read_mat_struct,
+)
+from neuroconv.tools.nwb_helpers import configure_and_write_nwbfile
 from neuroconv.utils import dict_deep_update, load_dict_from_file
 
 
+def read_info(info_file_path: str) -> dict:
+    """
+    Read (and cache) the 'Info' struct of a TDT Info.mat file.
+
+    The same Info.mat is read when naming the output file and when converting the session,
+    so it is only parsed once per process (until the file is modified).
+
+    Parameters
+    ----------
+    info_file_path : str
+        Path to the Info.mat file.
+
+    Returns
+    -------
+    dict
+        The 'Info' struct (subject ID, block name, start time, ...). It must not be modified.
+    """
+    info_file_path = str(info_file_path)
+    return _read_info(info_file_path=info_file_path, mtime=Path(info_file_path).stat().st_mtime)
+
+
+@lru_cache(maxsize=128)
+def _read_info(info_file_path: str, mtime: float) -> dict:
+    """
+    Read (and cache) the 'Info' struct of a TDT Info.mat file, keyed on its path and modification time.
+
+    Parameters
+    ----------
+    info_file_path : str
+        Path to the Info.mat file.
+    mtime : float
+        Modification time of the file, so that edits invalidate the cache.
+
+    Returns
+    -------
+    dict
+        The 'Info' struct. It must not be modified.
+    """
+    return read_mat_struct(file_path=info_file_path, variable_name="Info", in_memory=True)  # small file, one read
+
+
+@lru_cache(maxsize=4)
+def _load_editable_metadata(editable_metadata_path: str, mtime: float) -> dict:
+    """
+    Load (and cache) the editable metadata .yaml file.
+
+    Parameters
+    ----------
+    editable_metadata_path : str
+        Path to the editable metadata .yaml file.
+    mtime : float
+        Modification time of the file, so that edits invalidate the cache.
+
+    Returns
+    -------
+    dict
+        The editable metadata. It must be copied before being modified.
+    """
+    return load_dict_from_file(editable_metadata_path)
+
+
 def session_to_nwb(
     *,
     info_file_path: FilePath,
@@ -24,6 +92,8 @@ def session_to_nwb(
     output_dir_path: DirectoryPath,
     stub_test: bool = False,
     verbose: bool = True,
+    metadata_only: bool = False,
+    ephys_compression: Literal["gzip", "blosc-zstd"] = "gzip",
 ):
     """
     Convert a single session of DeepLabCut behavioral and electrophysiology data to NWB format.
@@ -56,6 +126,16 @@ def session_to_nwb(
         If True, only convert a small subset of the data for testing purposes.
     verbose : bool, default: True
         If True, print progress messages during conversion.
+    ephys_compression : "gzip" or "blosc-zstd", default: "gzip"
+        The compression of the EEG and EMG datasets (see configure_electrical_series_datasets). "blosc-zstd" is faster
+        than gzip, but the file can then only be read where hdf5plugin is installed.
+    metadata_only : bool, default: False
+        If True, stop once the metadata of the session is assembled and validated, without reading the bulk data or
+        writing the NWB file. This quickly checks the Info.mat files, metadata and paths of a batch of sessions.
+    overwrite : bool, default: False
+        If True, convert the session again even if its NWB file already exists in output_dir_path. By default, the
+        session is skipped, so that re-running a batch only converts the sessions that are missing. The NWB file is
+        only renamed into place once complete, so an existing NWB file is never partial.
 
     Returns
     -------
@@ -79,7 +159,16 @@ def session_to_nwb(
     emg_file_path = Path(emg_file_path)
     fs_file_path = Path(fs_file_path)
     output_dir_path = Path(output_dir_path)
-    output_dir_path.mkdir(parents=True, exist_ok=True)
+
+    info = read_info(info_file_path=str(info_file_path))
+    session_id = info["blockname"]
+    subject_id = info["Subject"]
+    session_start_time = parse_tdt_start_time(start=info["Start"], tzinfo=PST)
+    nwbfile_path = output_dir_path / f"sub-{subject_id}_ses-{session_id}.nwb"
+    if nwbfile_path.exists() and not overwrite and not metadata_only:
+        if verbose:
+            print(f"Session {session_id} for subject {subject_id} is skipped, since {nwbfile_path} already exists")
+        return
 
     source_data = dict()
     conversion_options = dict()
@@ -89,6 +178,8 @@ def session_to_nwb(
         video_name = "Video1"
     elif "Cam2" in video_file_path.name:
         video_name = "Video2"
+    else:
+        raise ValueError(f"Unrecognized camera in video file name: {video_file_path.name}")
     source_data["Video"] = dict(file_paths=[video_file_path], video_name=video_name)
     conversion_options["Video"] = dict()
 
@@ -111,15 +202,14 @@ def session_to_nwb(
 
     # Update default metadata with the editable in the corresponding yaml file
     editable_metadata_path = Path(__file__).parent / "huang_2025_001711_metadata.yaml"
-    editable_metadata = load_dict_from_file(editable_metadata_path)
-    metadata = dict_deep_update(metadata, editable_metadata)
+    editable_metadata = deepcopy(
+        _load_editable_metadata(
+            editable_metadata_path=str(editable_metadata_path), mtime=editable_metadata_path.stat().st_mtime
+        )
+    )
+    # The converter metadata is built fresh for this session, so it is updated in place rather than copied again
+    metadata = dict_deep_update(metadata, editable_metadata, copy=False)
 
-    info = read_mat(filename=info_file_path)["Info"]
-    session_id = info["blockname"]
-    subject_id = info["Subject"]
-    pst = ZoneInfo("US/Pacific")
-    session_start_time = datetime.datetime.strptime(info["Start"], "%I:%M:%S%p %m/%d/%Y").replace(tzinfo=pst)
-    nwbfile_path = output_dir_path / f"sub-{subject_id}_ses-{session_id}.nwb"
     metadata["NWBFile"]["session_id"] = session_id
     metadata["Subject"]["subject_id"] = subject_id
     metadata["NWBFile"]["session_start_time"] = session_start_time
@@ -127,8 +217,30 @@ def session_to_nwb(
         str(video_file_path)
     ]
 
+    if metadata_only:
+        converter.validate_metadata(metadata=metadata)
+        if verbose:
+            print(f"Session {session_id} for subject {subject_id} (start {session_start_time}) has valid metadata")
+        return
+
     # Run conversion
-    converter.run_conversion(metadata=metadata, nwbfile_path=nwbfile_path, conversion_options=conversion_options)
+    if not output_dir_path.is_dir():  # main() and dataset_to_nwb create it once for all sessions
+        output_dir_path.mkdir(parents=True, exist_ok=True)
+    # The steps of run_conversion, so that the chunking and compression of the EEG and EMG datasets are set once in
+    # the backend configuration of the file
+    converter.validate_metadata(metadata=metadata)
+    converter.validate_conversion_options(conversion_options=conversion_options)
+    converter.temporally_align_data_interfaces(metadata=metadata, conversion_options=conversion_options)
+    nwbfile = converter.create_nwbfile(metadata=metadata, conversion_options=conversion_options)
+    backend_configuration = converter.get_default_backend_configuration(nwbfile=nwbfile, backend="hdf5")
+    configure_electrical_series_datasets(backend_configuration=backend_configuration, compression=ephys_compression)
+    # Write to a temporary file that is only renamed once complete, so that an existing NWB file is always complete
+    # (an interrupted run leaves the temporary file, which is overwritten by the next run)
+    partial_nwbfile_path = nwbfile_path.with_name(f".{nwbfile_path.stem}.partial.nwb")
+    configure_and_write_nwbfile(
+        nwbfile=nwbfile, nwbfile_path=partial_nwbfile_path, backend_configuration=backend_configuration
+    )
+    os.replace(partial_nwbfile_path, nwbfile_path)
 
     if verbose:
         print(f"Session {session_id} for subject {subject_id} converted successfully to NWB format at {nwbfile_path}")
@@ -139,9 +251,10 @@ def main():
     data_dir_path = Path("/Volumes/T7/CatalystNeuro/Dan/Test - video analysis")
     output_dir_path = Path("/Volumes/T7/CatalystNeuro/Dan/conversion_nwb/huang_2025_001711")
     stub_test = False
+    metadata_only = False  # set to True to check the metadata of the example sessions without converting them
+    overwrite = False  # set to True to convert again the example sessions whose NWB file already exists
 
-    if output_dir_path.exists():
-        shutil.rmtree(output_dir_path)
+    output_dir_path.mkdir(parents=True, exist_ok=True)
 
     # Example Session
     info_file_path = data_dir_path / "M407" / "M407-S1" / "check_FP" / "Info.mat"
@@ -172,6 +285,8 @@ def main():
         fs_file_path=fs_file_path,
         output_dir_path=output_dir_path,
         stub_test=stub_test,
+        metadata_only=metadata_only,
+        overwrite=overwrite,
     )
 
 
@@ -1,14 +1,21 @@
 """Primary class for converting EEG and EMG data from .mat files."""
-from copy import deepcopy
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from itertools import chain
 from pathlib import Path
+from typing import Iterable, Optional
 
+import h5py
 import numpy as np
+from hdmf.common import VectorData
 from pydantic import FilePath
-from pymatreader import read_mat
-from pynwb.ecephys import Device, ElectricalSeries, ElectrodeGroup
+from pynwb.ecephys import Device, ElectricalSeries, ElectrodeGroup, ElectrodesTable
 from pynwb.file import NWBFile
+from tqdm import tqdm
 
+from dan_lab_to_nwb.utils import read_mat_variable
 from neuroconv.basedatainterface import BaseDataInterface
+from neuroconv.tools.hdmf import GenericDataChunkIterator
 from neuroconv.tools.nwb_helpers import get_module
 from neuroconv.tools.spikeinterface import add_devices_to_nwbfile
 from neuroconv.utils import get_base_schema
@@ -31,7 +38,9 @@ class Huang2025EcephysMatInterface(BaseDataInterface):
 
     keywords = ["EEG", "EMG"]
 
-    def __init__(self, eeg_file_path: FilePath, emg_file_path: FilePath, fs_file_path: FilePath):
+    def __init__(
+        self, eeg_file_path: FilePath, emg_file_path: FilePath, fs_file_path: FilePath, quantize: bool = False
+    ):
         """
         Initialize the ecephys interface.
 
@@ -43,8 +52,13 @@ class Huang2025EcephysMatInterface(BaseDataInterface):
             Path to .mat file containing EMG data as a 1D array.
         fs_file_path : FilePath
             Path to .mat file containing the sampling frequency (in Hz) for both EEG and EMG.
+        quantize : bool, default: False
+            If True, store the EEG and EMG as int16 scaled to their maximum absolute value, with the scale folded into
+            the conversion factor. This is 2x smaller than float32 at 15-bit precision, but it is lossy.
         """
-        super().__init__(eeg_file_path=eeg_file_path, emg_file_path=emg_file_path, fs_file_path=fs_file_path)
+        super().__init__(
+            eeg_file_path=eeg_file_path, emg_file_path=emg_file_path, fs_file_path=fs_file_path, quantize=quantize
+        )
 
     def get_metadata_schema(self) -> dict:
         """
@@ -116,41 +130,52 @@ class Huang2025EcephysMatInterface(BaseDataInterface):
 
         Notes
         -----
-        The data is stored with a conversion factor of 1e-6 (microvolts to volts).
+        The data is stored as float32 (or int16 if quantized) with a conversion factor of 1e-6 (microvolts to volts),
+        times the int16 scale if the data is quantized.
+        MATLAB v7.3 files are streamed from disk in chunks rather than loaded into memory.
+        The chunking and compression of the datasets are set by the backend configuration of the conversion.
         """
         # Load data
         eeg_file_path = Path(self.source_data["eeg_file_path"])
         emg_file_path = Path(self.source_data["emg_file_path"])
         fs_file_path = Path(self.source_data["fs_file_path"])
-        eeg_data = read_mat(eeg_file_path)["EEG"]
-        eeg_data = eeg_data.reshape(-1, 1)
-        emg_data = read_mat(emg_file_path)["EMG"]
-        emg_data = emg_data.reshape(-1, 1)
-        fs = read_mat(fs_file_path)["SampFreq"]
+        quantize = self.source_data["quantize"]
+        fs = _read_scalar_mat(file_path=str(fs_file_path), variable_name="SampFreq")
+        # The EEG and EMG files are independent, so overlap their (I/O-bound) loading
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            eeg_future = executor.submit(get_mat_data, file_path=eeg_file_path, variable_name="EEG", quantize=quantize)
+            emg_future = executor.submit(get_mat_data, file_path=emg_file_path, variable_name="EMG", quantize=quantize)
+            eeg_data, eeg_scale = eeg_future.result()
+            emg_data, emg_scale = emg_future.result()
 
         # Add Metadata to NWBFile
         add_devices_to_nwbfile(nwbfile=nwbfile, metadata=metadata)
         add_electrode_groups_to_nwbfile(nwbfile=nwbfile, metadata=metadata)
         add_electrodes_to_nwbfile(nwbfile=nwbfile, metadata=metadata)
+        group_name_to_electrode_indices = get_group_name_to_electrode_indices(nwbfile=nwbfile)
 
         # Add ElectricalSeries to NWBFile
         add_electrical_series_to_nwbfile(
             nwbfile=nwbfile,
             metadata=metadata,
             data=eeg_data,
+            conversion=1e-6 * eeg_scale,
             starting_time=0.0,
             rate=fs,
             es_key="ElectricalSeriesEEG",
             group_names=["ElectrodeGroupEEG"],
+            group_name_to_electrode_indices=group_name_to_electrode_indices,
         )
         add_electrical_series_to_nwbfile(
             nwbfile=nwbfile,
             metadata=metadata,
             data=emg_data,
+            conversion=1e-6 * emg_scale,
             starting_time=0.0,
             rate=fs,
             es_key="ElectricalSeriesEMG",
             group_names=["ElectrodeGroupEMG"],
+            group_name_to_electrode_indices=group_name_to_electrode_indices,
         )
 
 
@@ -175,8 +200,7 @@ def add_electrode_groups_to_nwbfile(nwbfile: NWBFile, metadata: DeepDict):
             continue
         device_name = group_metadata["device"]
         device = nwbfile.devices[device_name]
-        electrode_group_kwargs = deepcopy(group_metadata)
-        electrode_group_kwargs.update(device=device)
+        electrode_group_kwargs = dict(group_metadata, device=device)
         nwbfile.create_electrode_group(**electrode_group_kwargs)
 
 
@@ -201,7 +225,7 @@ def add_electrodes_to_nwbfile(nwbfile: NWBFile, metadata: DeepDict):
     """
     electrode_group_name_to_num_channels = {"ElectrodeGroupEEG": 1, "ElectrodeGroupEMG": 1}
 
-    nwbfile.add_electrode_column(name="channel_name", description="unique channel reference")
+    groups, locations, channel_names = [], [], []
     for group_metadata in metadata["Ecephys"]["ElectrodeGroup"]:
         group_name = group_metadata["name"]
         if group_name not in electrode_group_name_to_num_channels:
@@ -210,18 +234,64 @@ def add_electrodes_to_nwbfile(nwbfile: NWBFile, metadata: DeepDict):
         location = group_metadata.get("location", "unknown")
         num_channels = electrode_group_name_to_num_channels[group_name]
         for i in range(num_channels):
-            channel_name = f"{group_name[-3:]}{i+1}"  #  ex. ElectrodeGroupEEG --> EEG1
+            groups.append(group)
+            locations.append(location)
+            channel_names.append(f"{group_name[-3:]}{i+1}")  #  ex. ElectrodeGroupEEG --> EEG1
+
+    if nwbfile.electrodes is not None:
+        if "channel_name" not in nwbfile.electrodes.colnames:
+            nwbfile.add_electrode_column(name="channel_name", description="unique channel reference")
+        for group, location, channel_name in zip(groups, locations, channel_names):
             nwbfile.add_electrode(group=group, location=location, channel_name=channel_name)
+        return
+
+    # Build the electrodes table in one shot instead of validating every row with add_electrode
+    column_name_to_description = {col["name"]: col["description"] for col in ElectrodesTable.__columns__}
+    column_name_to_description["channel_name"] = "unique channel reference"
+    column_name_to_data = dict(
+        location=locations,
+        group=groups,
+        group_name=[group.name for group in groups],
+        channel_name=channel_names,
+    )
+    nwbfile.electrodes = ElectrodesTable(
+        columns=[
+            VectorData(name=colname, description=column_name_to_description[colname], data=data)
+            for colname, data in column_name_to_data.items()
+        ]
+    )
+
+
+def get_group_name_to_electrode_indices(nwbfile: NWBFile) -> dict[str, list[int]]:
+    """
+    Map each electrode group name to the indices of its rows in the NWB file's electrodes table.
+
+    Parameters
+    ----------
+    nwbfile : NWBFile
+        The NWB file object containing the electrodes table.
+
+    Returns
+    -------
+    dict[str, list[int]]
+        Mapping from electrode group name to electrodes table row indices.
+    """
+    group_name_to_electrode_indices = {}
+    for index, group_name in enumerate(nwbfile.electrodes.group_name.data[:]):
+        group_name_to_electrode_indices.setdefault(group_name, []).append(index)
+    return group_name_to_electrode_indices
 
 
 def add_electrical_series_to_nwbfile(
     nwbfile: NWBFile,
     metadata: DeepDict,
-    data: np.ndarray,
+    data: np.ndarray | GenericDataChunkIterator,
+    conversion: float = 1e-6,
     starting_time: float = 0.0,
     rate: float = 1.0,
     es_key: str = None,
     group_names: list[str] = None,
+    group_name_to_electrode_indices: dict[str, list[int]] | None = None,
 ):
     """
     Add an ElectricalSeries object to an NWB file.
@@ -236,8 +306,10 @@ def add_electrical_series_to_nwbfile(
     metadata : DeepDict
         Metadata dictionary containing electrical series specifications
         under metadata['Ecephys'][es_key].
-    data : np.ndarray
+    data : np.ndarray or GenericDataChunkIterator
         The electrical data to store, shape (n_samples, n_channels).
+    conversion : float, default: 1e-6
+        Scalar to multiply the data by to convert it to volts.
     starting_time : float, default: 0.0
         Start time of the recording in seconds.
     rate : float, default: 1.0
@@ -246,6 +318,9 @@ def add_electrical_series_to_nwbfile(
         Key to lookup electrical series metadata. If None, uses 'ElectricalSeries'.
     group_names : list of str or None, default: None
         Names of electrode groups to link to this series. If None, uses ['ElectrodeGroup'].
+    group_name_to_electrode_indices : dict of str to list of int or None, default: None
+        Precomputed output of get_group_name_to_electrode_indices, so that the electrodes table is only scanned once
+        when adding several series. If None, it is computed from the NWB file.
 
     Returns
     -------
@@ -255,7 +330,7 @@ def add_electrical_series_to_nwbfile(
     eseries_kwargs = dict(
         name=es_key,
         description="Processed data - LFP",
-        conversion=1e-6,
+        conversion=conversion,
         offset=0.0,
         starting_time=starting_time,
         rate=rate,
@@ -273,11 +348,11 @@ def add_electrical_series_to_nwbfile(
     )
 
     # Link to Electrodes table
-    electrode_table_indices = []
-    for group_name in group_names:
-        electrode_group_names = np.asarray(nwbfile.electrodes.group_name.data[:])
-        group_indices = np.where(electrode_group_names == group_name)[0]
-        electrode_table_indices.extend(group_indices)
+    if group_name_to_electrode_indices is None:
+        group_name_to_electrode_indices = get_group_name_to_electrode_indices(nwbfile=nwbfile)
+    electrode_table_indices = list(
+        chain.from_iterable(group_name_to_electrode_indices.get(group_name, []) for group_name in group_names)
+    )
     electrode_table_region = nwbfile.create_electrode_table_region(
         region=electrode_table_indices,
         description="electrode_table_region",
@@ -287,3 +362,247 @@ def add_electrical_series_to_nwbfile(
     # Create ElectricalSeries object and add it to nwbfile
     es = ElectricalSeries(**eseries_kwargs)
     ecephys_mod.add(es)
+
+
+def get_mat_data(
+    file_path: FilePath, variable_name: str, quantize: bool = False, chunk_mb: Optional[float] = None
+) -> tuple[np.ndarray | GenericDataChunkIterator, float]:
+    """
+    Get a 1D variable of a .mat file as a single-channel (n_samples, 1) array.
+
+    MATLAB v7.3 files are HDF5 files, so the variable is streamed from disk with a
+    Huang2025MatDataChunkIterator; older .mat files are loaded into memory, reading only that variable.
+
+    Parameters
+    ----------
+    file_path : FilePath
+        Path to the .mat file.
+    variable_name : str
+        Name of the variable to read (e.g. 'EEG' or 'EMG').
+    quantize : bool, default: False
+        If True, return the data as int16 scaled so that its maximum absolute value maps to 32767.
+        Otherwise, the data is returned as float32.
+    chunk_mb : float, optional
+        The upper bound on size in megabytes (MB) of the HDF5 chunks recommended by the iterator.
+        The default is the one of Huang2025MatDataChunkIterator.
+
+    Returns
+    -------
+    data : np.ndarray or GenericDataChunkIterator
+        The data with shape (n_samples, 1).
+    scale : float
+        The factor to multiply the returned data by to recover the original values (1.0 if not quantized).
+    """
+    if h5py.is_hdf5(file_path):
+        data_iterator = Huang2025MatDataChunkIterator(
+            file_path=file_path, variable_name=variable_name, quantize=quantize, chunk_mb=chunk_mb
+        )
+        return data_iterator, data_iterator.scale
+    data = _as_column(read_mat_variable(file_path=file_path, variable_name=variable_name))
+    if not quantize:
+        return data.astype(np.float32, copy=False), 1.0
+    scale = _get_int16_scale(max_abs=np.nanmax(np.abs(data)))
+    return np.rint(data / scale).astype(np.int16), scale
+
+
+def _as_column(array: np.ndarray) -> np.ndarray:
+    """
+    Get a (n, 1) column view of an array without copying it, unless it is not contiguous.
+
+    Setting the shape of a view raises instead of silently copying, so at most one copy is made
+    (by np.ascontiguousarray) for non-contiguous input.
+
+    Parameters
+    ----------
+    array : np.ndarray
+        The array to view as a column.
+
+    Returns
+    -------
+    np.ndarray
+        The (n, 1) column.
+    """
+    column = np.ascontiguousarray(array).view()
+    column.shape = (column.size, 1)
+    return column
+
+
+def _get_int16_scale(max_abs: float) -> float:
+    """
+    Get the scale that maps a maximum absolute value to the int16 range.
+
+    Parameters
+    ----------
+    max_abs : float
+        The maximum absolute value of the data.
+
+    Returns
+    -------
+    float
+        The scale such that data / scale fits in [-32767, 32767].
+    """
+    return max(float(max_abs), 1e-12) / 32767.0
+
+
+def _read_scalar_mat(file_path: str, variable_name: str) -> float:
+    """
+    Read (and cache) a single scalar variable from a .mat file without decoding the rest of the file.
+
+    Parameters
+    ----------
+    file_path : str
+        Path to the .mat file.
+    variable_name : str
+        Name of the scalar variable (e.g. 'SampFreq').
+
+    Returns
+    -------
+    float
+        The value of the variable.
+    """
+    file_path = str(file_path)
+    return _read_scalar_mat_cached(
+        file_path=file_path, variable_name=variable_name, mtime=Path(file_path).stat().st_mtime
+    )
+
+
+@lru_cache(maxsize=128)
+def _read_scalar_mat_cached(file_path: str, variable_name: str, mtime: float) -> float:
+    """
+    Read a single scalar variable from a .mat file (see _read_scalar_mat), keyed on its path and modification time.
+
+    Parameters
+    ----------
+    file_path : str
+        Path to the .mat file.
+    variable_name : str
+        Name of the scalar variable (e.g. 'SampFreq').
+    mtime : float
+        Modification time of the file, so that a rewritten file invalidates the cache.
+
+    Returns
+    -------
+    float
+        The value of the variable.
+    """
+    return float(read_mat_variable(file_path=file_path, variable_name=variable_name).ravel()[0])
+
+
+class Huang2025MatDataChunkIterator(GenericDataChunkIterator):
+    """DataChunkIterator that streams a 1D variable of a MATLAB v7.3 file as a (n_samples, 1) column."""
+
+    def __init__(
+        self,
+        file_path: FilePath,
+        variable_name: str,
+        quantize: bool = False,
+        buffer_gb: Optional[float] = None,
+        buffer_shape: Optional[tuple] = None,
+        chunk_mb: Optional[float] = None,
+        chunk_shape: Optional[tuple] = None,
+        display_progress: bool = False,
+        progress_bar_class: Optional[tqdm] = None,
+        progress_bar_options: Optional[dict] = None,
+    ):
+        """
+        Initialize an Iterable object which returns DataChunks with data and their selections on each iteration.
+
+        The .mat file is only opened while reading each buffer, so no file handle has to be kept open for the
+        lifetime of the conversion.
+
+        Parameters
+        ----------
+        file_path : FilePath
+            Path to the MATLAB v7.3 (.mat) file.
+        variable_name : str
+            Name of the 1D variable to stream (e.g. 'EEG' or 'EMG').
+        quantize : bool, default: False
+            If True, stream the data as int16 scaled so that its maximum absolute value maps to 32767.
+            The scale is stored in the `scale` attribute. Otherwise, the data is streamed as float32.
+        buffer_gb : float, optional
+            The upper bound on size in gigabytes (GB) of each selection from the iteration.
+            Cannot be set if `buffer_shape` is also specified.
+            The default is 1GB.
+        buffer_shape : tuple, optional
+            Manual specification of buffer shape to return on each iteration.
+            Must be a multiple of chunk_shape along each axis.
+            Cannot be set if `buffer_gb` is also specified.
+        chunk_mb : float, optional
+            The upper bound on size in megabytes (MB) of the internal chunk for the HDF5 dataset.
+            Cannot be set if `chunk_shape` is also specified.
+            The default is 10MB.
+        chunk_shape : tuple, optional
+            Manual specification of the internal chunk shape for the HDF5 dataset.
+            Cannot be set if `chunk_mb` is also specified.
+        display_progress : bool, optional
+            Display a progress bar with iteration rate and estimated completion time.
+        progress_bar_class : dict, optional
+            The progress bar class to use.
+            Defaults to tqdm.tqdm if the TQDM package is installed.
+        progress_bar_options : dict, optional
+            Dictionary of keyword arguments to be passed directly to tqdm.
+        """
+        self.file_path = Path(file_path)
+        self.variable_name = variable_name
+        with h5py.File(self.file_path, "r") as file:
+            dataset = file[variable_name]
+            # MATLAB stores vectors as (1, n) or (n, 1) depending on their orientation
+            self._sample_axis = int(np.argmax(dataset.shape))
+            self._num_samples = dataset.shape[self._sample_axis]
+            self._dtype = np.dtype("float32")
+            self.quantize = quantize
+            self.scale = 1.0
+            if quantize:
+                self._dtype = np.dtype("int16")
+                self.scale = _get_int16_scale(max_abs=self._get_max_abs(dataset=dataset))
+        super().__init__(
+            buffer_gb=buffer_gb,
+            buffer_shape=buffer_shape,
+            chunk_mb=chunk_mb,
+            chunk_shape=chunk_shape,
+            display_progress=display_progress,
+            progress_bar_class=progress_bar_class,
+            progress_bar_options=progress_bar_options,
+        )
+
+    def _get_data(self, selection: tuple[slice]) -> Iterable:
+        dataset_selection = [0, 0]
+        dataset_selection[self._sample_axis] = selection[0]
+        with h5py.File(self.file_path, "r") as file:
+            data = file[self.variable_name][tuple(dataset_selection)]
+        data = data.reshape(-1, 1)[:, selection[1]]
+        if self.quantize:
+            return np.rint(data / self.scale).astype(np.int16)
+        return data.astype(self._dtype, copy=False)
+
+    def _get_max_abs(self, dataset: h5py.Dataset, block_size: int = 2**22) -> float:
+        max_abs = 0.0
+        for start in range(0, self._num_samples, block_size):
+            dataset_selection = [0, 0]
+            dataset_selection[self._sample_axis] = slice(start, start + block_size)
+            max_abs = max(max_abs, float(np.nanmax(np.abs(dataset[tuple(dataset_selection)]))))
+        return max_abs
+
+    def _get_default_chunk_shape(self, chunk_mb: float = 10.0) -> tuple[int, int]:
+        """
+        Get a chunk shape that tiles the single channel along time.
+
+        Parameters
+        ----------
+        chunk_mb : float, default: 10.0
+            The upper bound on size in megabytes (MB) of each chunk.
+
+        Returns
+        -------
+        tuple[int, int]
+            The chunk shape as (number of samples, 1).
+        """
+        assert chunk_mb > 0, f"chunk_mb ({chunk_mb}) must be greater than zero!"
+        chunk_length = max(1, int(chunk_mb * 1e6) // self._dtype.itemsize)
+        return (min(chunk_length, self._num_samples), 1)
+
+    def _get_dtype(self):
+        return self._dtype
+
+    def _get_maxshape(self):
+        return (self._num_samples, 1)
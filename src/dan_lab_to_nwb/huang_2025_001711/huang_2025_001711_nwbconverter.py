@@ -1,13 +1,16 @@
 """Primary NWBConverter class for this dataset."""
+import os
+from pathlib import Path
+
+import numpy as np
+
 from dan_lab_to_nwb.huang_2025_001711 import (
     Huang2025BehaviorInterface,
     Huang2025EcephysMatInterface,
 )
+from dan_lab_to_nwb.utils import Huang2025ExternalVideoInterface
 from neuroconv import NWBConverter
-from neuroconv.datainterfaces import (
-    DeepLabCutInterface,
-    ExternalVideoInterface,
-)
+from neuroconv.datainterfaces import DeepLabCutInterface
 
 
 class Huang2025NWBConverter(NWBConverter):
@@ -31,18 +34,23 @@ class Huang2025NWBConverter(NWBConverter):
     """
 
     data_interface_classes = dict(
-        Video=ExternalVideoInterface,
+        Video=Huang2025ExternalVideoInterface,
         DeepLabCut=DeepLabCutInterface,
         Behavior=Huang2025BehaviorInterface,
         Ecephys=Huang2025EcephysMatInterface,
     )
 
+    def __init__(self, source_data: dict[str, dict], verbose: bool = False):
+        super().__init__(source_data=source_data, verbose=verbose)
+        self._video_timestamps = None
+
     def temporally_align_data_interfaces(self, metadata: dict | None = None, conversion_options: dict | None = None):
         """
         Align DeepLabCut timestamps to match video timestamps.
 
         This method ensures that the pose estimation data from DeepLabCut is
         temporally synchronized with the video recording timestamps.
+        The video timestamps are cached next to the video file, so the video is only scanned once.
 
         Parameters
         ----------
@@ -55,5 +63,45 @@ class Huang2025NWBConverter(NWBConverter):
         -------
         None
         """
-        video_timestamps = self.data_interface_objects["Video"].get_timestamps()[0]
+        video_timestamps = self._get_video_timestamps()
         self.data_interface_objects["DeepLabCut"].set_aligned_timestamps(video_timestamps)
+
+    def _get_video_timestamps(self) -> np.ndarray:
+        """
+        Get the video timestamps, cached on the converter and in a sidecar .npz file next to the video.
+
+        The cache is only used if it is newer than the video file and was computed for a video of the same size.
+        An unreadable cache (ex. truncated by an interrupted run) is recomputed. The cache is written to a temporary
+        file that is then renamed into place, so that it is never seen partially written. If it cannot be written
+        (ex. read-only data), the timestamps are still returned.
+
+        Returns
+        -------
+        np.ndarray
+            The timestamps of the video frames.
+        """
+        if self._video_timestamps is not None:
+            return self._video_timestamps
+
+        video_interface = self.data_interface_objects["Video"]
+        video_file_path = Path(video_interface.source_data["file_paths"][0])
+        video_stat = video_file_path.stat()
+        sidecar_file_path = video_file_path.with_name(f"{video_file_path.name}.timestamps.npz")
+        if sidecar_file_path.exists() and sidecar_file_path.stat().st_mtime >= video_stat.st_mtime:
+            try:
+                with np.load(sidecar_file_path) as sidecar:
+                    if int(sidecar["video_size"]) == video_stat.st_size:
+                        self._video_timestamps = sidecar["timestamps"]
+                        return self._video_timestamps
+            except Exception:
+                pass  # an unreadable cache is a cache miss
+
+        self._video_timestamps = video_interface.get_timestamps()[0]
+        temporary_sidecar_file_path = sidecar_file_path.with_name(f".{sidecar_file_path.name}.{os.getpid()}.tmp")
+        try:
+            with open(temporary_sidecar_file_path, "wb") as file:
+                np.savez(file, timestamps=self._video_timestamps, video_size=video_stat.st_size)
+            os.replace(temporary_sidecar_file_path, sidecar_file_path)
+        except OSError:
+            temporary_sidecar_file_path.unlink(missing_ok=True)  # the cache is an optimization only
+        return self._video_timestamps
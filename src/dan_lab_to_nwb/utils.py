@@ -0,0 +1,382 @@
+"""Helper functions shared by the Huang 2025 conversions."""
+import datetime
+import importlib
+import importlib.util
+import io
+import os
+import re
+import warnings
+from functools import lru_cache
+from pathlib import Path
+from typing import Literal
+from zoneinfo import ZoneInfo
+
+import h5py
+import numpy as np
+import pandas as pd
+from pydantic import FilePath
+from scipy.io import loadmat
+from threadpoolctl import threadpool_limits
+
+from neuroconv.datainterfaces import ExternalVideoInterface
+from neuroconv.tools.nwb_helpers import HDF5BackendConfiguration
+
+PST = ZoneInfo("US/Pacific")  # the time zone of the recordings
+_HDF5_SIGNATURE = b"\x89HDF\r\n\x1a\n"
+_MONTH_ABBREVIATION_TO_NUMBER = {
+    month: number
+    for number, month in enumerate(
+        ["Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"], start=1
+    )
+}
+_MATLAB_CLASS_TO_DTYPE = {
+    "double": np.float64,
+    "single": np.float32,
+    "logical": np.bool_,
+    **{f"int{bits}": np.dtype(f"int{bits}") for bits in (8, 16, 32, 64)},
+    **{f"uint{bits}": np.dtype(f"uint{bits}") for bits in (8, 16, 32, 64)},
+}
+_TDT_START_TIME_PATTERN = re.compile(r"(\d{1,2}):(\d{1,2}):(\d{1,2})([AaPp][Mm]) (\d{1,2})/(\d{1,2})/(\d{4})")
+
+
+def read_csv_with_parquet_cache(file_path: FilePath) -> pd.DataFrame:
+    """
+    Read a metadata .csv file, caching it as a sibling .parquet file for faster repeated loads.
+
+    The .parquet cache (written with pyarrow) is only used if it is newer than the .csv file. If the cache cannot be
+    read or written, the .csv file is read directly. The cache is written to a temporary file that is then renamed
+    into place, so that concurrent readers never see a partially written cache.
+
+    Parameters
+    ----------
+    file_path : FilePath
+        Path to the .csv file.
+
+    Returns
+    -------
+    pd.DataFrame
+        The contents of the .csv file.
+    """
+    file_path = Path(file_path)
+    parquet_path = file_path.with_suffix(".parquet")
+    if parquet_path.exists() and parquet_path.stat().st_mtime >= file_path.stat().st_mtime:
+        try:
+            return pd.read_parquet(parquet_path, engine="pyarrow")
+        except Exception:
+            pass  # an unreadable cache is a cache miss
+
+    df = pd.read_csv(file_path)
+    temporary_parquet_path = parquet_path.with_name(f".{parquet_path.name}.{os.getpid()}.tmp")
+    try:
+        df.to_parquet(temporary_parquet_path, engine="pyarrow")
+        os.replace(temporary_parquet_path, parquet_path)
+    except (OSError, TypeError, ValueError):
+        temporary_parquet_path.unlink(missing_ok=True)  # the cache is an optimization only
+    return df
+
+
+def read_mat_variable(file_path: FilePath, variable_name: str) -> np.ndarray:
+    """
+    Read a single variable from a .mat file without decoding the rest of the file.
+
+    MATLAB v7.3 files are HDF5 files, so the variable is read with h5py (see _read_hdf5_mat_value); older .mat files
+    are read with scipy.io.loadmat restricted to the requested variable. Both give the same array.
+
+    Parameters
+    ----------
+    file_path : FilePath
+        Path to the .mat file.
+    variable_name : str
+        Name of the variable to read.
+
+    Returns
+    -------
+    np.ndarray
+        The variable, with its singleton dimensions squeezed (a 0-d array for a single value).
+    """
+    if h5py.is_hdf5(file_path):
+        with h5py.File(file_path, "r") as file:
+            return np.asarray(_read_hdf5_mat_value(node=file[variable_name]))
+    return np.asarray(loadmat(file_path, variable_names=[variable_name], squeeze_me=True)[variable_name])
+
+
+def read_mat_struct(file_path: FilePath, variable_name: str, in_memory: bool = False) -> dict:
+    """
+    Read a single MATLAB struct from a .mat file as a dictionary, without decoding the rest of the file.
+
+    MATLAB v7.3 files are HDF5 files, so the struct fields are read with h5py (see _read_hdf5_mat_value); older .mat
+    files are read with scipy.io.loadmat restricted to the requested variable. Both give the same dictionary, with
+    char arrays as str, single values as scalars, cell arrays as object arrays and nested structs as dictionaries.
+
+    Parameters
+    ----------
+    file_path : FilePath
+        Path to the .mat file.
+    variable_name : str
+        Name of the struct variable (e.g. 'Info').
+    in_memory : bool, default: False
+        Whether to read the whole file with a single sequential read and parse it from memory. This is faster for
+        small files on high-latency storage (ex. external or network drives), where each of the many small reads of
+        the parsers pays the full latency.
+
+    Returns
+    -------
+    dict
+        The fields of the struct.
+    """
+    if in_memory:
+        file_bytes = Path(file_path).read_bytes()
+        is_hdf5 = _is_hdf5_bytes(file_bytes)
+        file = io.BytesIO(file_bytes)
+    else:
+        is_hdf5 = h5py.is_hdf5(file_path)
+        file = file_path
+    if is_hdf5:
+        with h5py.File(file, "r") as h5_file:
+            return _read_hdf5_mat_value(node=h5_file[variable_name])
+    return loadmat(file, variable_names=[variable_name], simplify_cells=True)[variable_name]
+
+
+def _is_hdf5_bytes(file_bytes: bytes) -> bool:
+    """Check for the HDF5 signature, which is at offset 0 or after a user block (512 bytes in MATLAB v7.3 files)."""
+    offset = 0
+    while offset + len(_HDF5_SIGNATURE) <= len(file_bytes):
+        if file_bytes[offset : offset + len(_HDF5_SIGNATURE)] == _HDF5_SIGNATURE:
+            return True
+        offset = max(512, 2 * offset)
+    return False
+
+
+def _read_hdf5_mat_value(node: h5py.Group | h5py.Dataset):
+    """
+    Recursively read a MATLAB v7.3 variable stored as an HDF5 group or dataset, as scipy.io.loadmat reads it with
+    simplify_cells=True from older .mat files.
+
+    Structs are read as dictionaries, char arrays as str, cell arrays (datasets of HDF5 object references) as object
+    arrays of their dereferenced cells, and numeric arrays in MATLAB orientation (HDF5 stores them transposed) with
+    singleton dimensions squeezed, or as Python scalars if they hold a single value. Empty arrays, whose dataset holds
+    their dimensions rather than data (MATLAB_empty attribute), are read as empty arrays of their MATLAB class.
+
+    Parameters
+    ----------
+    node : h5py.Group or h5py.Dataset
+        The HDF5 group or dataset of the variable.
+
+    Returns
+    -------
+    dict, str, int, float or np.ndarray
+        The value of the variable.
+    """
+    if isinstance(node, h5py.Group):
+        return {field_name: _read_hdf5_mat_value(node=field) for field_name, field in node.items()}
+    matlab_class = node.attrs.get("MATLAB_class", b"double")
+    matlab_class = matlab_class.decode() if isinstance(matlab_class, bytes) else str(matlab_class)
+    if node.attrs.get("MATLAB_empty", 0):
+        if matlab_class == "char":
+            return np.array([], dtype="<U1")
+        return np.array([], dtype=_MATLAB_CLASS_TO_DTYPE.get(matlab_class, np.float64))
+    value = node[()].T
+    if matlab_class == "char":
+        rows = ["".join(map(chr, row)) for row in np.atleast_2d(value)]
+        return rows[0] if len(rows) == 1 else np.array(rows)
+    if value.dtype == object:
+        cells = np.empty(value.shape, dtype=object)
+        for index, reference in np.ndenumerate(value):
+            cells[index] = _read_hdf5_mat_value(node=node.file[reference])
+        cells = np.squeeze(cells)
+        return cells.item() if cells.ndim == 0 else cells
+    value = np.squeeze(value)
+    return value.item() if value.size == 1 else value
+
+
+def configure_electrical_series_datasets(
+    backend_configuration: HDF5BackendConfiguration,
+    frames_per_chunk: int = 2**20,
+    compression: Literal["gzip", "blosc-zstd"] = "gzip",
+) -> None:
+    """
+    Set the chunking and compression of the EEG and EMG datasets in the backend configuration of a conversion.
+
+    Each chunk spans all the channels of a series and up to frames_per_chunk frames along time. By default, the chunks
+    are compressed with gzip level 1 (with shuffling), which compresses several times faster than the default level 4
+    for a slightly larger file. The other datasets keep their default configuration.
+
+    Parameters
+    ----------
+    backend_configuration : HDF5BackendConfiguration
+        The backend configuration of the conversion, from get_default_backend_configuration. It is modified in place.
+    frames_per_chunk : int, default: 2**20
+        The maximum number of frames of each chunk.
+    compression : "gzip" or "blosc-zstd", default: "gzip"
+        The compression of the chunks. "blosc-zstd" uses the Blosc zstd codec (level 3) with bit shuffling from
+        hdf5plugin, which is faster still, but the file can then only be read where hdf5plugin is installed.
+        If hdf5plugin is not installed, gzip is used instead, with a warning.
+    """
+    if compression == "blosc-zstd" and importlib.util.find_spec("hdf5plugin") is None:
+        warnings.warn("hdf5plugin is not installed, so the EEG and EMG datasets are compressed with gzip instead.")
+        compression = "gzip"
+    if compression == "blosc-zstd":
+        compressors = ["Blosc"]
+        compressor_options = [dict(cname="zstd", clevel=3, shuffle=2)]  # 2 is Blosc.BITSHUFFLE
+    else:
+        compressors = ["shuffle", "gzip"]
+        compressor_options = [None, dict(level=1)]
+    for dataset_configuration in backend_configuration.dataset_configurations.values():
+        if dataset_configuration.dataset_name != "data":
+            continue
+        if not dataset_configuration.location_in_file.startswith("processing/ecephys/ElectricalSeries"):
+            continue
+        number_of_frames, number_of_channels = dataset_configuration.full_shape
+        # The configuration is validated on every assignment, so the buffer (only used to rewrite datasets that are
+        # already on disk) is set to the full shape first, which any chunk shape divides
+        dataset_configuration.buffer_shape = dataset_configuration.full_shape
+        dataset_configuration.chunk_shape = (min(number_of_frames, frames_per_chunk), number_of_channels)
+        dataset_configuration.compressor_options = None
+        dataset_configuration.compressors = compressors
+        dataset_configuration.compressor_options = compressor_options
+
+
+def parse_tdt_start_time(start: str, tzinfo: datetime.tzinfo) -> datetime.datetime:
+    """
+    Parse the 'Start' field of a TDT Info.mat file (ex. '9:00:00am 04/05/2025') into a timezone-aware datetime.
+
+    Equivalent to datetime.strptime(start, "%I:%M:%S%p %m/%d/%Y"), with a precompiled pattern for this fixed format.
+
+    Parameters
+    ----------
+    start : str
+        The start time formatted as '%I:%M:%S%p %m/%d/%Y'.
+    tzinfo : datetime.tzinfo
+        The time zone of the start time.
+
+    Returns
+    -------
+    datetime.datetime
+        The start time.
+    """
+    match = _TDT_START_TIME_PATTERN.fullmatch(start)
+    if match is None:  # let strptime report the mismatch
+        return datetime.datetime.strptime(start, "%I:%M:%S%p %m/%d/%Y").replace(tzinfo=tzinfo)
+    hour, minute, second, am_pm, month, day, year = match.groups()
+    hour = int(hour) % 12 + (12 if am_pm.lower() == "pm" else 0)
+    return datetime.datetime(int(year), int(month), int(day), hour, int(minute), int(second), tzinfo=tzinfo)
+
+
+def read_video_header(file_path: FilePath) -> tuple[int, float]:
+    """
+    Read (and cache) the frame count and frame rate stated by the container header of a video file.
+
+    Parameters
+    ----------
+    file_path : FilePath
+        Path to the video file.
+
+    Returns
+    -------
+    tuple[int, float]
+        The number of frames and the frames per second.
+    """
+    file_path = str(file_path)
+    stat = os.stat(file_path)
+    return _read_video_header(file_path=file_path, mtime=stat.st_mtime, size=stat.st_size)
+
+
+@lru_cache(maxsize=16)
+def _read_video_header(file_path: str, mtime: float, size: int) -> tuple[int, float]:
+    """
+    Read the header of a video file (see read_video_header), keyed on its path, modification time and size.
+
+    Parameters
+    ----------
+    file_path : str
+        Path to the video file.
+    mtime : float
+        Modification time of the file, so that edits invalidate the cache.
+    size : int
+        Size of the file in bytes, so that a file that is still being written invalidates the cache.
+
+    Returns
+    -------
+    tuple[int, float]
+        The number of frames and the frames per second.
+    """
+    from neuroconv.datainterfaces.behavior.video.video_utils import VideoCaptureContext
+
+    with VideoCaptureContext(file_path=file_path) as video:
+        return video.get_video_frame_count(), video.get_video_fps()
+
+
+class Huang2025ExternalVideoInterface(ExternalVideoInterface):
+    """
+    ExternalVideoInterface that opens each video file once to read both its frame count and frame rate.
+
+    ExternalVideoInterface opens the (multi-GB) video files again for each header value it needs when the series
+    is added; here the values are read together and cached with read_video_header.
+    """
+
+    def _get_header_frame_counts(self) -> list[int]:
+        return [read_video_header(file_path=file_path)[0] for file_path in self.source_data["file_paths"]]
+
+    def _get_header_frame_rates(self) -> list[float]:
+        return [read_video_header(file_path=file_path)[1] for file_path in self.source_data["file_paths"]]
+
+
+def parse_tdt_utc_start_time(date: str, utc_start_time: str, tzinfo: datetime.tzinfo) -> datetime.datetime:
+    """
+    Parse the 'date' and 'utcStartTime' fields of a TDT Info.mat file (ex. '2025-Apr-09' and '14:10:06') into a
+    datetime in the given time zone.
+
+    The month abbreviation is looked up directly, so unlike datetime.strptime with '%b' this does not depend on the
+    locale.
+
+    Parameters
+    ----------
+    date : str
+        The UTC date formatted as '%Y-%b-%d'.
+    utc_start_time : str
+        The UTC start time formatted as '%H:%M:%S'.
+    tzinfo : datetime.tzinfo
+        The time zone to convert the start time to.
+
+    Returns
+    -------
+    datetime.datetime
+        The start time.
+    """
+    try:
+        year, month, day = date.split("-")
+        hour, minute, second = utc_start_time.split(":")
+        session_start_time_utc = datetime.datetime(
+            int(year),
+            _MONTH_ABBREVIATION_TO_NUMBER[month.title()],
+            int(day),
+            int(hour),
+            int(minute),
+            int(second),
+            tzinfo=datetime.timezone.utc,
+        )
+    except (KeyError, ValueError) as error:
+        raise ValueError(f"Unrecognized TDT date '{date}' and UTC start time '{utc_start_time}'.") from error
+    return session_start_time_utc.astimezone(tzinfo)
+
+
+def init_conversion_worker(*module_names: str):
+    """
+    Initialize a conversion worker process, for use as a ProcessPoolExecutor initializer.
+
+    The given modules (ex. the session_to_nwb module of the dataset) are imported once when the pool starts the
+    worker, so that the first session of each worker does not pay for the imports, and the worker is limited to a
+    single BLAS/OpenMP thread so that parallel sessions do not oversubscribe.
+
+    Parameters
+    ----------
+    *module_names : str
+        The names of the modules to import.
+    """
+    for variable_name in ("OMP_NUM_THREADS", "OPENBLAS_NUM_THREADS", "MKL_NUM_THREADS"):
+        os.environ[variable_name] = "1"
+    for module_name in module_names:
+        importlib.import_module(module_name)
+    # The environment variables only apply to the libraries that are loaded after this point, while a forked worker
+    # inherits the libraries already loaded by its parent, so their thread pools are also limited at runtime
+    threadpool_limits(limits=1)
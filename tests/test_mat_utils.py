@@ -0,0 +1,120 @@
+"""Check that MATLAB v7 and v7.3 files are read the same way by read_mat_struct and read_mat_variable."""
+import h5py
+import numpy as np
+import pytest
+from scipy.io import savemat
+
+from dan_lab_to_nwb.utils import read_mat_struct, read_mat_variable
+
+_MATLAB_CLASSES = {
+    np.dtype("float64"): "double",
+    np.dtype("float32"): "single",
+    np.dtype("int32"): "int32",
+    np.dtype("uint8"): "uint8",
+}
+
+
+def _write_v73_value(group: h5py.Group, name: str, value, refs: h5py.Group):
+    """Write a value as MATLAB v7.3 does: transposed arrays, uint16 chars, empty dimensions and cell references."""
+    if isinstance(value, dict):
+        struct = group.create_group(name)
+        struct.attrs["MATLAB_class"] = np.bytes_("struct")
+        for field_name, field_value in value.items():
+            _write_v73_value(group=struct, name=field_name, value=field_value, refs=refs)
+        return
+    if isinstance(value, str):
+        if value:
+            dataset = group.create_dataset(name, data=np.array([[ord(c)] for c in value], dtype=np.uint16))
+        else:
+            dataset = group.create_dataset(name, data=np.array([0, 0], dtype=np.uint64))
+            dataset.attrs["MATLAB_empty"] = np.uint8(1)
+        dataset.attrs["MATLAB_class"] = np.bytes_("char")
+        return
+    value = np.asarray(value)
+    if value.dtype == object:
+        references = np.empty(value.shape, dtype=h5py.ref_dtype)
+        for index, cell in np.ndenumerate(value):
+            cell_name = str(len(refs))
+            _write_v73_value(group=refs, name=cell_name, value=cell, refs=refs)
+            references[index] = refs[cell_name].ref
+        dataset = group.create_dataset(name, data=references.T)
+        dataset.attrs["MATLAB_class"] = np.bytes_("cell")
+        return
+    value = np.atleast_2d(value)
+    if value.size == 0:
+        dataset = group.create_dataset(name, data=np.array(value.shape[::-1], dtype=np.uint64))
+        dataset.attrs["MATLAB_empty"] = np.uint8(1)
+    else:
+        dataset = group.create_dataset(name, data=value.T)
+    dataset.attrs["MATLAB_class"] = np.bytes_(_MATLAB_CLASSES[value.dtype])
+
+
+def _write_mat_files(tmp_path, variables: dict):
+    """Write the variables to a MATLAB v7 file with scipy and to a MATLAB v7.3 (HDF5) file with h5py."""
+    v7_file_path = tmp_path / "v7.mat"
+    savemat(v7_file_path, variables)
+    v73_file_path = tmp_path / "v73.mat"
+    with h5py.File(v73_file_path, "w", userblock_size=512) as file:
+        refs = file.create_group("#refs#")
+        for name, value in variables.items():
+            _write_v73_value(group=file, name=name, value=value, refs=refs)
+    return v7_file_path, v73_file_path
+
+
+def _assert_same_value(v7_value, v73_value):
+    """Assert that two values read from .mat files have the same type, shape, dtype and contents."""
+    assert type(v7_value) is type(v73_value)
+    if isinstance(v7_value, dict):
+        assert v7_value.keys() == v73_value.keys()
+        for field_name in v7_value:
+            _assert_same_value(v7_value[field_name], v73_value[field_name])
+    elif isinstance(v7_value, np.ndarray) and v7_value.dtype == object:
+        assert v7_value.shape == v73_value.shape
+        for v7_cell, v73_cell in zip(v7_value.flat, v73_value.flat):
+            _assert_same_value(v7_cell, v73_cell)
+    elif isinstance(v7_value, np.ndarray):
+        assert v7_value.dtype == v73_value.dtype
+        np.testing.assert_array_equal(v7_value, v73_value)
+    else:
+        assert v7_value == v73_value
+
+
+def test_read_mat_struct_v7_and_v73_match(tmp_path):
+    cell = np.empty((1, 2), dtype=object)
+    cell[0, 0] = "M301"
+    cell[0, 1] = np.array([[1.0, 2.0]])
+    info = dict(
+        blockname="M301_M302-241018-072001",
+        Start="9:00:00am 10/18/2024",
+        Subject="",
+        duration=3600.5,
+        channel=np.int32(4),
+        streams=np.array([[1.0, 2.0, 3.0]]),
+        matrix=np.arange(6.0).reshape(2, 3),
+        empty=np.zeros((0, 0)),
+        cell=cell,
+        nested=dict(name="LFP1", rate=1017.25),
+    )
+    v7_file_path, v73_file_path = _write_mat_files(tmp_path=tmp_path, variables=dict(Info=info))
+
+    v73_info = read_mat_struct(file_path=v73_file_path, variable_name="Info")
+    for in_memory in (False, True):
+        v7_info = read_mat_struct(file_path=v7_file_path, variable_name="Info", in_memory=in_memory)
+        _assert_same_value(v7_info, v73_info)
+    assert v73_info["blockname"] == "M301_M302-241018-072001"
+    assert v73_info["channel"] == 4
+    _assert_same_value(v73_info, read_mat_struct(file_path=v73_file_path, variable_name="Info", in_memory=True))
+
+
+@pytest.mark.parametrize(
+    "value",
+    [np.array([[1017.25]]), np.array([[1.0, 2.0, 3.0]]), np.array([[1], [3], [2]], dtype=np.uint8), np.zeros((0, 0))],
+    ids=["scalar", "row", "column", "empty"],
+)
+def test_read_mat_variable_v7_and_v73_match(tmp_path, value):
+    v7_file_path, v73_file_path = _write_mat_files(tmp_path=tmp_path, variables=dict(variable=value))
+
+    v7_array = read_mat_variable(file_path=v7_file_path, variable_name="variable")
+    v73_array = read_mat_variable(file_path=v73_file_path, variable_name="variable")
+    _assert_same_value(v7_array, v73_array)
+    np.testing.assert_array_equal(v73_array.ravel(), value.ravel())